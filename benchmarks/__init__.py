@@ -0,0 +1,15 @@
+"""
+Benchmarks for the tw2.core hot paths.
+
+These are plain scripts with no dependencies beyond tw2.core and the template
+engines it already supports, so they can be run offline from a source
+checkout::
+
+    python -m benchmarks.bench_memory
+
+To catch regressions, run them all with :mod:`benchmarks.run`, which compares
+their results with a baseline recorded earlier on the same machine::
+
+    python -m benchmarks.run --save
+    python -m benchmarks.run
+"""
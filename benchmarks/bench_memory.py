@@ -0,0 +1,72 @@
+"""
+Per-instance memory footprint of prepared widget trees.
+
+Builds a :class:`tw2.core.RepeatingWidget` grid whose rows are compound
+widgets, prepares it as it would be for display, and reports the memory
+retained per row and per widget instance. The peak memory of displaying the
+grid is compared with a `streaming` grid fed from an iterator.
+"""
+from __future__ import print_function
+
+import tw2.core as twc
+
+from .common import (setup_request, start_request, measure_memory,
+                     measure_peak_memory, report)
+
+
+class Cell(twc.Widget):
+    template = '<td>${w.value}</td>'
+    inline_engine_name = 'mako'
+
+
+class Row(twc.CompoundWidget):
+    a = Cell()
+    b = Cell()
+    c = Cell()
+
+
+class Grid(twc.RepeatingWidget):
+    id = 'grid'
+    child = Row
+
+
+class StreamingGrid(Grid):
+    streaming = True
+
+
+def prepared_grid(value):
+    ins = Grid.req(value=value)
+    ins.prepare()
+    return ins
+
+
+def main(rows=2000):
+    mw = setup_request()
+    value = [dict(a=i, b=i, c=i) for i in range(rows)]
+
+    # The first pass creates the per-repetition classes, which are not
+    # what is being measured here.
+    prepared_grid(value)
+    start_request(mw)
+
+    _, size = measure_memory(lambda: prepared_grid(value))
+    instances = rows * (len(Row.children) + 1) + 1
+    report('grid of %d rows, per row' % rows, float(size) / rows, 'bytes')
+    report('grid of %d rows, per instance' % rows,
+           float(size) / instances, 'bytes')
+
+    # The list of rows is built before measuring, while the streaming grid
+    # pulls each row from a generator as it is displayed.
+    rows_iter = (dict(a=i, b=i, c=i) for i in range(rows))
+    for grid, grid_value in ((Grid, value), (StreamingGrid, rows_iter)):
+        grid.display(value=value)
+        start_request(mw)
+        _, peak = measure_peak_memory(
+            lambda: grid.display(value=grid_value))
+        report('%s display of %d rows, peak' % (grid.__name__, rows),
+               float(peak) / 1024, 'KiB')
+        start_request(mw)
+
+
+if __name__ == '__main__':
+    main()
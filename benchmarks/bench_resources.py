@@ -0,0 +1,69 @@
+"""
+:func:`tw2.core.resources.inject_resources` on a large page, static files
+served by :class:`tw2.core.resources.ResourcesApp` through the middleware,
+and :class:`tw2.core.js.TWEncoder` encoding of widget options.
+"""
+from __future__ import print_function
+
+import webob
+
+import tw2.core as twc
+from tw2.core.resources import inject_resources
+
+from .common import setup_request, measure_time, report
+
+
+def resources(count=20):
+    out = []
+    for i in range(count):
+        out.append(twc.JSLink(link='/js/script%d.js' % i))
+        out.append(twc.CSSLink(link='/css/style%d.css' % i))
+    out.append(twc.JSSource(src='init();', location='bodybottom'))
+    out = [r.req() for r in out]
+    for r in out:
+        r.prepare()
+    return out
+
+
+def page(rows=2000):
+    """ An html page of about 100KB. """
+    body = ''.join('<tr><td>row %d</td><td><input name="r%d"/></td></tr>\n'
+                   % (i, i) for i in range(rows))
+    return ('<html><head><title>Page</title></head><body><table>\n%s'
+            '</table></body></html>' % body)
+
+
+def options(count=50):
+    """ Widget options of the kind passed to javascript widgets. """
+    return {
+        'id': 'grid',
+        'columns': [{'name': 'col%d' % i, 'width': i * 10, 'sortable': True,
+                     'formatter': twc.js_symbol('fmt%d' % i)}
+                    for i in range(count)],
+        'onSelect': twc.js_callback('function(row) { select(row); }'),
+        'onLoad': twc.js_function('init')(twc.js_symbol('this'), 'grid'),
+        'data': [[i, 'row %d' % i, i * 1.5, None] for i in range(count)],
+    }
+
+
+def main():
+    mw = setup_request(auto_reload_templates=False)
+
+    html, res = page(), resources()
+    report('inject_resources, %dKB page, %d resources' %
+           (len(html) // 1024, len(res)),
+           measure_time(lambda: inject_resources(html, res)) * 1000, 'ms')
+
+    mw.resources.register('tw2.core', 'templates/display_children.mak')
+    req = webob.Request.blank(
+        mw.config.res_prefix + 'tw2.core/templates/display_children.mak')
+    report('serve a static resource',
+           measure_time(lambda: req.get_response(mw).body) * 1e6, 'us')
+
+    opts = options()
+    report('TWEncoder.encode, %d columns' % len(opts['columns']),
+           measure_time(lambda: twc.encoder.encode(opts)) * 1e6, 'us')
+
+
+if __name__ == '__main__':
+    main()
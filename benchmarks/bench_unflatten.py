@@ -0,0 +1,36 @@
+"""
+:func:`tw2.core.validation.unflatten_params` over synthetic grid form posts.
+"""
+from __future__ import print_function
+
+from webob.multidict import MultiDict
+
+from tw2.core.validation import unflatten_params
+
+from .common import setup_request, measure_time, report
+
+
+def grid_post(rows, columns=10):
+    """ A flat post as a form holding a grid would submit it. """
+    params = [('form:title', 'Bulk edit')]
+    for i in range(rows):
+        for j in range(columns):
+            params.append(('form:grid:%d:col%d' % (i, j), 'value %d' % i))
+    return params
+
+
+def main():
+    setup_request()
+    for rows in (100, 1000, 5000):
+        post = grid_post(rows)
+        as_dict = dict(post)
+        as_multidict = MultiDict(post)
+        report('unflatten dict, %d fields' % len(post),
+               measure_time(lambda: unflatten_params(as_dict)) * 1000, 'ms')
+        report('unflatten MultiDict, %d fields' % len(post),
+               measure_time(lambda: unflatten_params(as_multidict)) * 1000,
+               'ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Validation of a bulk-edit grid: a :class:`tw2.core.RepeatingWidget` whose rows
+are compound widgets of validated fields; and of a form of nested compound
+widgets, with and without a :mod:`tw2.core.metrics` sink installed.
+"""
+from __future__ import print_function
+
+import re
+
+import tw2.core as twc
+from tw2.core import metrics
+
+from .common import setup_request, start_request, measure_time, report
+
+
+class Row(twc.CompoundWidget):
+    name = twc.Widget(validator=twc.StringLengthValidator(max=20))
+    qty = twc.Widget(validator=twc.IntValidator(min=0))
+    email = twc.Widget(validator=twc.EmailValidator())
+
+
+class Grid(twc.RepeatingWidget):
+    id = 'grid'
+    child = Row
+
+
+class Address(twc.CompoundWidget):
+    street = twc.Widget(validator=twc.StringLengthValidator(max=50))
+    city = twc.Widget(validator=twc.StringLengthValidator(max=50))
+    postcode = twc.Widget(validator=twc.RegexValidator(
+        regex=re.compile(r'^\d{5}$')))
+
+
+class Form(twc.CompoundWidget):
+    id = 'form'
+    name = twc.Widget(validator=twc.StringLengthValidator(max=20))
+    age = twc.Widget(validator=twc.IntValidator(min=0))
+    email = twc.Widget(validator=twc.EmailValidator())
+    home = Address(id='home')
+    work = Address(id='work')
+
+
+def form_post():
+    post = {'form:name': 'Homer', 'form:age': '39',
+            'form:email': 'homer@example.com'}
+    for address in ('home', 'work'):
+        post['form:%s:street' % address] = '742 Evergreen Terrace'
+        post['form:%s:city' % address] = 'Springfield'
+        post['form:%s:postcode' % address] = '12345'
+    return post
+
+
+def rows(count, bad_every=None):
+    out = []
+    for i in range(count):
+        qty = str(i)
+        if bad_every and not i % bad_every:
+            qty = 'x'
+        out.append({'name': 'row %d' % i, 'qty': qty,
+                    'email': 'row%d@example.com' % i})
+    return out
+
+
+def validate(mw, value):
+    start_request(mw)
+    try:
+        Grid.validate({'grid': value})
+    except twc.ValidationError:
+        pass
+
+
+def main(count=2000):
+    mw = setup_request()
+    for name, value in (('valid', rows(count)),
+                        ('1% invalid', rows(count, bad_every=100))):
+        report('validate grid of %d rows, %s' % (count, name),
+               measure_time(lambda: validate(mw, value)) * 1000, 'ms')
+
+    def validate_form(post):
+        start_request(mw)
+        Form.validate(post)
+
+    post = form_post()
+    report('validate form of 9 fields',
+           measure_time(lambda: validate_form(post)) * 1e6, 'us')
+
+    def validate_bad_form(post):
+        try:
+            validate_form(post)
+        except twc.ValidationError:
+            pass
+
+    bad = dict(post, **{'form:age': 'x'})
+    report('validate form of 9 fields, 1 invalid',
+           measure_time(lambda: validate_bad_form(bad)) * 1e6, 'us')
+
+    metrics.set_sink(metrics.Registry())
+    try:
+        report('validate form of 9 fields, instrumented',
+               measure_time(lambda: validate_form(post)) * 1e6, 'us')
+    finally:
+        metrics.set_sink(None)
+
+
+if __name__ == '__main__':
+    main()
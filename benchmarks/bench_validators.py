@@ -0,0 +1,80 @@
+"""
+Micro-benchmarks of single validators, and of :class:`tw2.core.All` and
+:class:`tw2.core.Any` chains, on valid and invalid input; and of validating
+a column of values with ``validate_many``.
+"""
+from __future__ import print_function
+
+import datetime
+import re
+
+import tw2.core as twc
+
+from .common import setup_request, measure_time, report
+
+
+def cases():
+    email = twc.EmailValidator()
+    length = twc.StringLengthValidator(max=50)
+    return [
+        ('IntValidator', twc.IntValidator(min=0, max=1000), '42', 'x'),
+        ('RegexValidator', twc.RegexValidator(regex=re.compile(r'^\d{5}$')),
+         '12345', '1234'),
+        ('DateTimeValidator', twc.DateTimeValidator(),
+         '2024-02-29 13:45', '2024-02-30 13:45'),
+        ('EmailValidator', email, 'user@example.com', 'user@'),
+        ('All(length, email)', twc.All(length, email),
+         'user@example.com', 'user@'),
+        ('All(All(length, email), url)',
+         twc.All(twc.All(length, email), twc.UrlValidator()),
+         'user@example.com', 'user@'),
+        ('Any(email, url)', twc.Any(email, twc.UrlValidator()),
+         'http://example.com', 'user@'),
+    ]
+
+
+def validate(validator, value):
+    try:
+        validator.to_python(value)
+    except twc.ValidationError:
+        pass
+
+
+def column(good, bad, count=10000, bad_every=10):
+    return [bad if not i % bad_every else good for i in range(count)]
+
+
+def dates(count=10000, bad_every=10):
+    """ Distinct dates, so they are not served from the validator's memo. """
+    start = datetime.date(2000, 1, 1)
+    return ['2024-02-30' if not i % bad_every else
+            (start + datetime.timedelta(days=i)).strftime('%Y-%m-%d')
+            for i in range(count)]
+
+
+def main():
+    setup_request()
+    for name, validator, good, bad in cases():
+        for label, value in (('valid', good), ('invalid', bad)):
+            report('%s, %s' % (name, label),
+                   measure_time(lambda: validate(validator, value)) * 1e6,
+                   'us')
+
+    for name, validator, values in (
+            ('EmailValidator', twc.EmailValidator(),
+             column('user@example.com', 'user@')),
+            ('UrlValidator', twc.UrlValidator(),
+             column('http://example.com', 'example.com')),
+            ('IpAddressValidator', twc.IpAddressValidator(),
+             column('192.168.1.10', '192.168.1.300')),
+            ('DateValidator', twc.DateValidator(), dates())):
+        report('%s, 10000 values one at a time' % name,
+               measure_time(lambda: [validate(validator, v)
+                                     for v in values]) * 1000, 'ms')
+        report('%s, 10000 values with validate_many' % name,
+               measure_time(lambda: validator.validate_many(values)) * 1000,
+               'ms')
+
+
+if __name__ == '__main__':
+    main()
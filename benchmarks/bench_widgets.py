@@ -0,0 +1,126 @@
+"""
+Widget class creation through :class:`tw2.core.widgets.WidgetMeta`, and
+:meth:`tw2.core.Widget.display` of leaf, compound and repeating widgets of
+several sizes in each supported template engine that is installed, and
+:meth:`tw2.core.Widget.display_to` of a deep tree.
+"""
+from __future__ import print_function
+
+import tw2.core as twc
+
+from .common import setup_request, start_request, measure_time, report
+
+# A leaf template, inline, in each engine.
+LEAF_TEMPLATES = {
+    'mako': '<span>${w.value}</span>',
+    'genshi': '<span xmlns:py="http://genshi.edgewall.org/">${w.value}</span>',
+    'jinja': '<span>{{ w.value }}</span>',
+    'kajiki': '<span>${w.value}</span>',
+    'chameleon': '<span>${w.value}</span>',
+}
+CHILDREN_TEMPLATE = 'tw2.core.templates.display_children'
+
+
+def engines():
+    """ The names of the engines that are installed. """
+    modules = {'mako': 'mako', 'genshi': 'genshi', 'jinja': 'jinja2',
+               'kajiki': 'kajiki', 'chameleon': 'chameleon'}
+    out = []
+    for engine in sorted(modules):
+        try:
+            __import__(modules[engine])
+        except ImportError:
+            print('%s is not installed; skipped' % engine)
+        else:
+            out.append(engine)
+    return out
+
+
+def leaf(engine, **kw):
+    return twc.Widget(template=LEAF_TEMPLATES[engine],
+                      inline_engine_name=engine, **kw)
+
+
+def compound(engine, size):
+    return twc.CompoundWidget(
+        id='form', template='%s:%s' % (engine, CHILDREN_TEMPLATE),
+        children=[leaf(engine, id='f%d' % i, value=i) for i in range(size)])
+
+
+def repeating(engine, size):
+    return twc.RepeatingWidget(
+        id='grid', template='%s:%s' % (engine, CHILDREN_TEMPLATE),
+        child=leaf(engine), value=list(range(size)))
+
+
+def tree(engine, depth, width):
+    """ Compound widgets nested `depth` deep, each with `width` children. """
+    if depth == 0:
+        return leaf(engine, value='x' * 100)
+    # Unprefixed, the Mako flavor is rendered natively, as in most apps.
+    template = CHILDREN_TEMPLATE if engine == 'mako' else \
+        '%s:%s' % (engine, CHILDREN_TEMPLATE)
+    return twc.CompoundWidget(
+        template=template,
+        children=[tree(engine, depth - 1, width)(id='c%d' % i)
+                  for i in range(width)])
+
+
+def define_form(size):
+    """ Define a compound widget class, and its children, as a module would.
+    """
+    attrs = dict(('f%d' % i, twc.Widget(validator=twc.IntValidator()))
+                 for i in range(size))
+    attrs['id'] = 'form'
+    return type('Form', (twc.CompoundWidget,), attrs)
+
+
+def main(sizes=(10, 100)):
+    # As in production; otherwise every display compiles its template anew.
+    mw = setup_request(auto_reload_templates=False)
+
+    report('define a leaf widget class',
+           measure_time(lambda: type('Leaf', (twc.Widget,), {})) * 1e6, 'us')
+    # As Widget(...) and display do with arguments, many times a request.
+    base = leaf('mako')
+    report('subclass a widget with Widget(...)',
+           measure_time(lambda: base(id='x', value='x')) * 1e6, 'us')
+    for size in sizes:
+        report('define a compound of %d children' % size,
+               measure_time(lambda: define_form(size)) * 1000, 'ms')
+
+    def display(w):
+        start_request(mw)
+        # As a page is displayed, so that the output is serialized.
+        w.display(displays_on='string')
+
+    for engine in engines():
+        w = leaf(engine, id='x', value='x')
+        display(w)
+        report('%s, display leaf' % engine,
+               measure_time(lambda: display(w)) * 1e6, 'us')
+        for size in sizes:
+            for name, make in (('compound', compound),
+                               ('repeating', repeating)):
+                w = make(engine, size)
+                display(w)
+                report('%s, display %s of %d' % (engine, name, size),
+                       measure_time(lambda: display(w)) * 1000, 'ms')
+
+        w = tree(engine, 5, 3)
+
+        def display_to(w):
+            start_request(mw)
+            out = []
+            w.display_to(out.append, displays_on='string')
+            return ''.join(out)
+
+        display(w)
+        report('%s, display tree of depth 5' % engine,
+               measure_time(lambda: display(w)) * 1000, 'ms')
+        report('%s, display_to tree of depth 5' % engine,
+               measure_time(lambda: display_to(w)) * 1000, 'ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+""" Helpers shared by the benchmark scripts. """
+from __future__ import print_function
+
+import collections
+import gc
+import timeit
+
+import tw2.core as twc
+import tw2.core.core
+
+try:
+    import tracemalloc
+except ImportError:
+    # py2
+    tracemalloc = None
+
+
+def setup_request(**config):
+    """ Create a middleware and start a fresh request for it. """
+    mw = twc.make_middleware(None, **config)
+    start_request(mw)
+    return mw
+
+
+def start_request(mw):
+    """ Reset request-local storage, as the middleware does per request. """
+    rl = tw2.core.core.request_local()
+    rl.clear()
+    rl['middleware'] = mw
+    return rl
+
+
+def measure_time(fn, number=None, repeat=3):
+    """ Return the best time per call of `fn`, in seconds. """
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_memory(fn):
+    """ Return ``(result, bytes)`` where bytes is the memory still allocated
+    by `fn` once it has returned.  The result is kept alive while measuring.
+    """
+    if tracemalloc is None:
+        raise RuntimeError("Memory benchmarks require tracemalloc (py3)")
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = fn()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return result, size
+
+
+def measure_peak_memory(fn):
+    """ Return ``(result, bytes)`` where bytes is the peak memory allocated
+    while `fn` was running.
+    """
+    if tracemalloc is None:
+        raise RuntimeError("Memory benchmarks require tracemalloc (py3)")
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+#: What :func:`report` was passed, as ``{name: (value, unit)}``.
+results = collections.OrderedDict()
+
+
+def report(name, value, unit):
+    results[name] = (value, unit)
+    print("%-50s %12.2f %s" % (name, value, unit))
@@ -0,0 +1,147 @@
+"""
+Run the benchmark scripts and compare their results with a baseline.
+
+Every result is a time or a size, so lower is better. A result more than
+`--tolerance` above its baseline is reported as a regression, and makes the
+run exit with status 1, as does a benchmark that fails::
+
+    python -m benchmarks.run --save        # record a baseline
+    python -m benchmarks.run               # compare with it
+    python -m benchmarks.run validation    # only run bench_validation
+
+Baselines are only comparable on the machine and Python version that
+recorded them, so each is stored under a key naming both, and the baseline
+file can hold one for each machine a project is benchmarked on. Runners that
+should share a baseline, such as those of a CI service, can name it with
+`--machine`. A machine without a baseline of its own is compared with the
+committed ``reference`` baseline for its Python version, recorded with
+`--machine reference`; with neither, the run exits with status 1, as
+nothing was checked.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import pkgutil
+import platform
+import sys
+import traceback
+
+from . import common
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+REFERENCE = 'reference'
+
+
+def modules():
+    """ The names of the benchmark scripts, without the ``bench_`` prefix.
+    """
+    path = os.path.dirname(__file__)
+    return sorted(name[len('bench_'):]
+                  for _, name, _ in pkgutil.iter_modules([path])
+                  if name.startswith('bench_'))
+
+
+def machine(name=None):
+    return '%s, python %s' % (name or platform.node(),
+                              platform.python_version())
+
+
+def run(names):
+    """ Run the named benchmark scripts, and return ``{key: [value, unit]}``
+    for their results, and the names of those that failed. """
+    out = {}
+    failed = []
+    for name in names:
+        print('== %s' % name)
+        common.results.clear()
+        try:
+            module = __import__('benchmarks.bench_' + name,
+                                fromlist=['main'])
+            module.main()
+        except Exception:
+            traceback.print_exc()
+            print('%s failed' % name)
+            failed.append(name)
+        for key, (value, unit) in common.results.items():
+            out['%s: %s' % (name, key)] = [value, unit]
+    return out, failed
+
+
+def compare(results, baseline, tolerance):
+    """ Print each result against its baseline, and return the keys of
+    those that regressed. """
+    regressions = []
+    print('\n%-70s %12s %12s %8s' % ('', 'baseline', 'now', 'change'))
+    for key in sorted(results):
+        value, unit = results[key]
+        if key not in baseline:
+            print('%-70s %12s %12.2f %8s  %s' % (key, '-', value, '', unit))
+            continue
+        base = baseline[key][0]
+        change = (value - base) / base if base else 0.0
+        flag = ''
+        if change > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print('%-70s %12.2f %12.2f %+7.0f%%  %s%s' %
+              (key, base, value, change * 100, unit, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help='benchmarks to run (default: all of %s)' %
+                        ', '.join(modules()))
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the baseline')
+    parser.add_argument('--machine', metavar='NAME',
+                        help='name of the baseline to use (default: the '
+                             'host name, or %s if it has none)' % REFERENCE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slowdown reported as a regression '
+                             '(default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+
+    key = machine(args.machine)
+    results, failed = run(args.names or modules())
+    if failed:
+        print('\nFailed: %s' % ', '.join(failed))
+
+    if args.save:
+        if failed:
+            print('Baseline not saved')
+            return 1
+        # Keep the baseline of benchmarks that were not run this time.
+        stored.setdefault(key, {}).update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=1, sort_keys=True)
+        print('\nBaseline for %s saved to %s' % (key, args.baseline))
+        return 0
+
+    if key not in stored and args.machine is None and \
+       machine(REFERENCE) in stored:
+        key = machine(REFERENCE)
+        print('\nNo baseline for this machine; comparing with %s' % key)
+    if key not in stored:
+        print('\nNo baseline for %s in %s; run with --save to record one' %
+              (key, args.baseline))
+        return 1
+    regressions = compare(results, stored[key], args.tolerance)
+    if regressions:
+        print('\n%d regression(s) beyond %d%%' %
+              (len(regressions), args.tolerance * 100))
+    return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
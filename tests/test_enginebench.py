@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+import six
+
+import tw2.core as twc
+import tw2.core.core
+import testapi
+from tw2.core import enginebench
+
+form = twc.CompoundWidget(
+    id='form', template='tw2.core.templates.display_children',
+    children=[twc.Widget(id='a', template='tw2.core.test_templates.simple')])
+
+
+class TestEngineBench(TestCase):
+    def setUp(self):
+        testapi.setup()
+
+    def test_benchmark(self):
+        engines = [e for e in ('mako', 'jinja')
+                   if e in enginebench.installed_engines()]
+        mw = twc.make_middleware(None)
+        tw2.core.core.request_local()['middleware'] = mw
+        results = enginebench.benchmark_engines(form, engines + ['nosuch'],
+                                                number=1, repeat=1)
+        assert(tw2.core.core.request_local()['middleware'] is mw)
+        assert(results[-1] == ('nosuch', float('inf'), None, 'not installed'))
+        assert(sorted(r.engine for r in results[:-1]) == sorted(engines))
+        assert(all(r.seconds > 0 for r in results[:-1]))
+        assert(enginebench.recommend(results) ==
+               [r.engine for r in results[:-1]])
+
+    def test_missing_template(self):
+        if 'jinja' not in enginebench.installed_engines():
+            return
+        w = twc.Widget(template='tw2.core.test_templates.simple_mako')
+        results = enginebench.benchmark_engines(w, ['jinja'], number=1)
+        assert('Could not find engine' in results[0].error)
+        assert(enginebench.recommend(results) == [])
+
+    def test_recommend(self):
+        R = enginebench.EngineResult
+        results = [R('mako', 2.0, None, None), R('jinja', 1.0, None, None),
+                   R('genshi', float('inf'), None, 'failed')]
+        assert(enginebench.recommend(results) == ['jinja', 'mako'])
+
+    def test_main(self):
+        import sys
+        stdout = sys.stdout
+        sys.stdout = six.StringIO()
+        try:
+            status = enginebench.main([
+                'test_enginebench:form', '--engines', 'nosuch'])
+            out = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        assert(status == 1)
+        assert('nosuch     failed' in out)
@@ -0,0 +1,102 @@
+import io
+from unittest import TestCase
+
+import tw2.core as twc
+import testapi
+from tw2.core import formparser
+
+
+def environ(body, content_type):
+    return {
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+
+
+def multipart(*parts):
+    body = []
+    for headers, data in parts:
+        body.append(b'--XyZ\r\n' + headers + b'\r\n\r\n' + data + b'\r\n')
+    body.append(b'--XyZ--\r\n')
+    return environ(b''.join(body), 'multipart/form-data; boundary=XyZ')
+
+
+class TestFormParser(TestCase):
+    def setUp(self):
+        testapi.setup()
+
+    def test_urlencoded(self):
+        env = environ(b'a%3Ab=1&c=%C3%A9+x&&d=',
+                      'application/x-www-form-urlencoded')
+        fields = list(formparser.iter_form_fields(env, chunk_size=3))
+        assert(fields == [('a:b', '1'), ('c', u'\xe9 x'), ('d', '')])
+
+    def test_multipart(self):
+        env = multipart(
+            (b'Content-Disposition: form-data; name="a:b"', b'1'),
+            (b'Content-Disposition: form-data; name="c"', b'\xc3\xa9\r\nx'),
+            (b'Content-Disposition: form-data; name="f"; filename="f.txt"\r\n'
+             b'Content-Type: text/plain', b'hello' * 1000),
+        )
+        fields = list(formparser.iter_form_fields(env, chunk_size=7))
+        assert(fields[:2] == [('a:b', '1'), ('c', u'\xe9\r\nx')])
+        name, upload = fields[2]
+        assert(name == 'f')
+        assert(upload.filename == 'f.txt')
+        assert(upload.type == 'text/plain')
+        assert(upload.file.read() == b'hello' * 1000)
+
+    def test_too_large(self):
+        env = environ(b'a=' + b'x' * 100, 'application/x-www-form-urlencoded')
+        fields = formparser.iter_form_fields(env, max_memory=50, chunk_size=8)
+        try:
+            list(fields)
+            assert(False)
+        except twc.ValidationError as e:
+            assert(str(e) == 'Form submission is too large')
+
+    def test_files_not_counted(self):
+        env = multipart(
+            (b'Content-Disposition: form-data; name="f"; filename="f.txt"',
+             b'x' * 100),
+        )
+        fields = list(formparser.iter_form_fields(env, max_memory=50))
+        assert(fields[0][1].value == b'x' * 100)
+
+    def test_truncated(self):
+        env = multipart(
+            (b'Content-Disposition: form-data; name="a"', b'1'),
+        )
+        env['wsgi.input'] = io.BytesIO(env['wsgi.input'].read()[:-12])
+        del env['CONTENT_LENGTH']
+        env['wsgi.input_terminated'] = True
+        try:
+            list(formparser.iter_form_fields(env))
+            assert(False)
+        except twc.ValidationError as e:
+            assert('corrupted' in str(e))
+
+    def test_bad_encoding(self):
+        env = environ(b'a=%FF', 'application/x-www-form-urlencoded')
+        try:
+            list(formparser.iter_form_fields(env))
+            assert(False)
+        except twc.ValidationError as e:
+            assert('utf-8' in str(e))
+
+    def test_no_length(self):
+        env = environ(b'a=1', 'application/x-www-form-urlencoded')
+        del env['CONTENT_LENGTH']
+        assert(list(formparser.iter_form_fields(env)) == [])
+        assert(env['wsgi.input'].tell() == 0)
+
+    def test_bad_length(self):
+        for length in ('x', '-1'):
+            env = environ(b'a=1', 'application/x-www-form-urlencoded')
+            env['CONTENT_LENGTH'] = length
+            try:
+                list(formparser.iter_form_fields(env))
+                assert(False)
+            except twc.ValidationError as e:
+                assert('corrupted' in str(e))
@@ -0,0 +1,127 @@
+import json
+import logging
+import socket
+from unittest import TestCase
+
+import webob
+
+import tw2.core as twc
+import testapi
+from tw2.core import metrics
+
+
+class Row(twc.CompoundWidget):
+    qty = twc.Widget(validator=twc.IntValidator(min=0))
+    email = twc.Widget(validator=twc.EmailValidator())
+
+
+class Grid(twc.RepeatingWidget):
+    id = 'grid'
+    child = Row
+
+
+class Recorder(object):
+    def __init__(self):
+        self.records = []
+
+    def record(self, kind, key, seconds, failed):
+        self.records.append((kind, key, failed))
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        testapi.setup()
+
+    def tearDown(self):
+        metrics.set_sink(None)
+
+    def test_registry(self):
+        registry = metrics.Registry()
+        metrics.set_sink(registry)
+        try:
+            Grid.validate({'grid:0:qty': '1', 'grid:0:email': 'a@b.com',
+                           'grid:1:qty': 'x', 'grid:1:email': 'a@b.com'})
+            assert(False)
+        except twc.ValidationError:
+            pass
+        stats = dict(((s['kind'], s['key']), s) for s in registry.stats())
+        assert(stats['widget', 'grid']['calls'] == 1)
+        assert(stats['widget', 'grid']['failures'] == 1)
+        assert(stats['widget', 'grid:#:qty']['calls'] == 2)
+        assert(stats['widget', 'grid:#:qty']['failures'] == 1)
+        assert(stats['widget', 'grid:#:email']['failures'] == 0)
+        assert(stats['validator', 'IntValidator']['calls'] == 2)
+        assert(stats['validator', 'EmailValidator']['failures'] == 0)
+        assert(registry.stats()[0]['key'] == 'grid')
+
+        resp = registry.request(webob.Request.blank('/?kind=validator'))
+        data = json.loads(resp.body.decode('utf-8'))
+        assert(set(s['key'] for s in data) ==
+               set(['IntValidator', 'EmailValidator']))
+
+        registry.reset()
+        assert(registry.stats() == [])
+
+    def test_no_sink(self):
+        assert(not hasattr(twc.IntValidator.to_python, '_untimed'))
+        metrics.set_sink(Recorder())
+        assert(hasattr(twc.IntValidator.__dict__['to_python'], '_untimed'))
+        assert(metrics.set_sink(None) is not None)
+        assert(not hasattr(twc.IntValidator.to_python, '_untimed'))
+        assert(twc.IntValidator().to_python('1') == 1)
+
+    def test_compound_validators(self):
+        sink = Recorder()
+        metrics.set_sink(sink)
+        v = twc.All(twc.StringLengthValidator(max=3), twc.EmailValidator())
+        assert(v.validate_many(['a@', 'a@b.com']) ==
+               [twc.Invalid, twc.Invalid])
+        assert(sink.records == [('validator', 'All', True)] * 2)
+        v = twc.RegexValidator(regex='^a')
+        assert(v.validate_many(['a', 'b']) == ['a', twc.Invalid])
+        assert(sink.records[2:] == [('validator', 'RegexValidator', False),
+                                    ('validator', 'RegexValidator', True)])
+
+    def test_subclass_while_timed(self):
+        sink = Recorder()
+        metrics.set_sink(sink)
+
+        class Positive(twc.IntValidator):
+            def _validate_python(self, value, state=None):
+                if value <= 0:
+                    raise twc.ValidationError('toosmall', self)
+            msgs = {'toosmall': 'Too small'}
+
+        self.assertRaises(twc.ValidationError, Positive().to_python, '0')
+        assert(sink.records == [('validator', 'Positive', True)])
+        metrics.set_sink(None)
+        self.assertRaises(twc.ValidationError, Positive().to_python, '0')
+
+    def test_logging_sink(self):
+        logged = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                logged.append(record.getMessage())
+
+        logger = logging.getLogger('tw2.core.test_metrics')
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(Handler())
+        metrics.set_sink(metrics.LoggingSink(logger))
+        twc.IntValidator().validate_many(['1', 'x'])
+        assert(len(logged) == 2)
+        assert(logged[0].startswith('validator IntValidator '))
+        assert(logged[1].endswith('ms failed'))
+
+    def test_udp_sink(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+        try:
+            sink = metrics.UDPSink(port=server.getsockname()[1])
+            sink.record('widget', 'grid:#:qty', 0.002, True)
+            data = server.recv(1024).decode('utf-8').split('\n')
+        finally:
+            server.close()
+        assert(data == ['tw2.widget.grid._.qty:2.000|ms',
+                        'tw2.widget.grid._.qty.failures:1|c'])
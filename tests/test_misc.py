@@ -16,3 +16,22 @@ class TestMisc(object):
         thread.start_new_thread(self._rl_thread2, (rl,))
     def _rl_thread2(self, rl):
         assert(twc.util.thread_local() is not rl)
+
+    def test_copy_on_write_dict(self):
+        data = {'a': 1}
+        d = twc.util.CopyOnWriteDict(data)
+        assert(d == {'a': 1} and d['a'] == 1 and 'a' in d and len(d) == 1)
+        d['b'] = 2
+        d.pop('a')
+        assert(d == {'b': 2})
+        assert(data == {'a': 1})
+        assert(d.copy() == {'b': 2} and d.copy() is not d._data)
+
+    def test_copy_on_write_dict_extra(self):
+        data = {'a': 1, 'b': 2}
+        d = twc.util.CopyOnWriteDict(data, {'b': 3, 'c': 4})
+        assert(list(d.items()) == [('a', 1), ('b', 3), ('c', 4)])
+        assert(len(d) == 3 and d.get('b') == 3 and 'c' in d)
+        del d['a']
+        assert(d == {'b': 3, 'c': 4} and d._extra is None)
+        assert(data == {'a': 1, 'b': 2})
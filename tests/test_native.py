@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+import tw2.core as twc
+import tw2.core.core
+import testapi
+from tw2.core import templating
+
+
+def with_template(widget):
+    """ `widget` rendered by its template rather than natively. """
+    return widget(_native_template=None)
+
+
+class TestNative(TestCase):
+    def setUp(self):
+        testapi.setup()
+        self.mw = twc.make_middleware(None)
+        tw2.core.core.request_local()['middleware'] = self.mw
+
+    def check(self, widget, **kw):
+        native = widget.req(**kw)
+        native.prepare()
+        expected = with_template(widget).req(**kw)
+        expected.prepare()
+        assert(native.display(displays_on='string') ==
+               expected.display(displays_on='string'))
+
+    def test_resources(self):
+        for link in ('/a.js', '/a.js?x=1&y="2"&z=\'3\'', '<b>'):
+            self.check(twc.JSLink(link=link))
+            self.check(twc.JSLink(link=link, attrs={
+                'async': 'async', 'defer': True, 'data-x': '<&>',
+                'nohref': False, 'y': None}))
+            self.check(twc.CSSLink(link=link))
+            self.check(twc.CSSLink(link=link, media='print & <screen>'))
+        for src in ('if (a<b && c) {}', 'a>b{}'):
+            self.check(twc.JSSource(src=src))
+            self.check(twc.CSSSource(src=src))
+        self.check(twc.resources._JSFuncCall(function='f', args=['a', 1]))
+
+    def test_children(self):
+        leaf = twc.Widget(template='<i>$w.id</i>', inline_engine_name='mako')
+        for separator in (None, '', '<hr/>'):
+            for count in (0, 1, 3):
+                self.check(twc.CompoundWidget(
+                    id='f', separator=separator, attrs={'title': 'a"<\'&'},
+                    children=[leaf(id='c%d' % i) for i in range(count)]))
+                self.check(twc.RepeatingWidget(
+                    id='r', separator=separator, child=leaf,
+                    value=list(range(count))))
+
+    def test_other_engine(self):
+        link = twc.JSLink(link='/a.js', attrs={
+            'async': 'async', 'defer': True, 'data-x': '<&>',
+            'nohref': False, 'y': None})
+        expected = link.req().display(displays_on='string').strip()
+        mw = twc.make_middleware(None, preferred_rendering_engines=['jinja'])
+        tw2.core.core.request_local()['middleware'] = mw
+        templating.engine_name_cache.clear()
+        try:
+            w = twc.JSLink(link='/a.js').req()
+            assert(w.display(displays_on='string').startswith('<script'))
+            assert(link.req().display(displays_on='string').strip() ==
+                   expected)
+        finally:
+            templating.engine_name_cache.clear()
+
+    def test_custom_template(self):
+        w = twc.JSLink(link='/a.js', template='<b>${w.link}</b>',
+                       inline_engine_name='mako')
+        assert(w.display(displays_on='string') == '<b>/a.js</b>')
+
+    def test_widget_attrs(self):
+        from tw2.core.native import format_attrs, widget_attrs
+
+        class W(twc.Widget):
+            id = 'w'
+            template = 'x'
+            attrs = {'style': 'a<b', 'checked': True, 'nowrap': False,
+                     'title': None, 'size': 3, 'data': ['x']}
+            placeholder = twc.Param(attribute=True, default='"p"')
+
+        for _ in range(2):
+            w = W.req()
+            w.prepare()
+            assert(widget_attrs(w) == format_attrs(w.attrs))
+            assert('_attr_fragments' in W.__dict__)
+
+        W.attrs['style'] = 'c'
+        W.attrs['new'] = '&'
+        del W.attrs['size']
+        W.attrs['data'].append('y')
+        w = W.req()
+        w.prepare()
+        assert(widget_attrs(w) == format_attrs(w.attrs))
+        assert('style="c"' in widget_attrs(w))
+        assert('data="[\'x\', \'y\']"' in widget_attrs(w).replace('&#x27;', "'"))
@@ -68,6 +68,19 @@ class TestParams(object):
         eq_(Test.test1, 10)
         eq_(Test5.test1, 11)
 
+    def test_shared_tables(self):
+        "Check a subclass shares unchanged params with its base"
+        class Test9(Test2):
+            pass
+        class Test10(Test2):
+            test1 = 11
+        assert(Test9._params is Test2._params)
+        assert(Test9._all_params is Test2._all_params)
+        assert(Test10._params is not Test2._params)
+        assert(Test10._params['test2'] is Test2._params['test2'])
+        eq_(Test10._params['test1'].default, 11)
+        eq_(Test2._params['test1'].default, 10)
+
     def test_child(self):
         assert(not hasattr(TestContainer, 'test'))
         test = twc.Widget(id='q')
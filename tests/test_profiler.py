@@ -0,0 +1,93 @@
+import json
+from unittest import TestCase
+
+from webob import Request, Response
+
+import tw2.core as twc
+import testapi
+from tw2.core import profiler
+from tw2.core.middleware import TwMiddleware
+
+CHILDREN = 'mako:tw2.core.templates.display_children'
+
+
+def form():
+    return twc.CompoundWidget(id='form', template=CHILDREN, children=[
+        twc.Widget(id='a', template='mako:${w.value}',
+                   inline_engine_name='mako',
+                   value=twc.Deferred(lambda: 'x')),
+        twc.RepeatingWidget(id='grid', template=CHILDREN, repetitions=3,
+                            child=twc.Widget(template='mako:<i/>',
+                                             inline_engine_name='mako')),
+    ])
+
+
+def find(node, kind, name):
+    for c in node['children']:
+        if c['kind'] == kind and c['name'] == name:
+            return c
+    raise KeyError((kind, name))
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        testapi.setup()
+
+    def test_tree(self):
+        w = form()
+        with profiler.profile() as prof:
+            w.display()
+        assert(profiler.active == 0)
+
+        tree = json.loads(prof.to_json())
+        assert(tree['calls'] == 1)
+        root = find(tree, 'widget', 'form')
+        prepare = find(root, 'prepare', 'form')
+        assert(find(prepare, 'deferred', 'value')['calls'] == 1)
+        template = find(root, 'template', CHILDREN)
+        a = find(template, 'widget', 'form:a')
+        find(a, 'template', '<inline mako>')
+        grid = find(find(template, 'widget', 'form:grid'), 'template',
+                    CHILDREN)
+        rep = find(grid, 'widget', 'form:grid:#')
+        assert(rep['calls'] == 3)
+        assert(root['time'] >= template['time'] >= a['time'])
+        assert(root['self_time'] <= root['time'])
+
+        lines = prof.collapsed().split('\n')
+        assert(lines[0].startswith('request '))
+        assert(lines[1].startswith('request;widget form '))
+        assert(('request;widget form;template %s;widget form:a;'
+                'template <inline mako> ' % CHILDREN)
+               in '\n'.join(lines))
+
+    def test_inactive(self):
+        with profiler.profile() as outer:
+            with profiler.profile() as inner:
+                form().display()
+            assert(inner.root.children)
+            assert(not outer.root.children)
+            form().display()
+        assert(outer.root.children)
+        assert(profiler.span('widget', 'x') is profiler._null_span)
+
+    def test_middleware(self):
+        profiles = []
+
+        def app(environ, start_response):
+            resp = Response(
+                '<html><head></head><body>%s</body></html>' %
+                twc.Widget(id='x', template='mako:<b/>',
+                           inline_engine_name='mako').display())
+            return resp(environ, start_response)
+
+        mw = TwMiddleware(app, profile_header='X-TW2-Profile',
+                          profile_callback=lambda req, prof:
+                              profiles.append(prof.to_dict()))
+        Request.blank('/').get_response(mw)
+        assert(profiles == [])
+        Request.blank('/', headers={'X-TW2-Profile': '1'}).get_response(mw)
+        assert(len(profiles) == 1)
+        find(profiles[0], 'widget', 'x')
+        find(profiles[0], 'inject', 'resources')
+        assert(profiler.active == 0)
@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import with_statement
 import tw2.core as twc
 import testapi
+import gc
 import itertools
 import os
 import webob as wo
@@ -12,6 +13,7 @@ from nose.tools import raises, eq_
 from sieve.operators import assert_eq_xml as assert_eq_xhtml
 import six
 import unittest
+import weakref
 
 # TBD: only test engines that are installed
 engines = ['genshi', 'mako', 'jinja', 'chameleon']
@@ -114,6 +116,78 @@ class TestTemplate(unittest.TestCase):
             assert(isinstance(out, six.text_type))
             assert(out == '<p>TEST test1</p>')
 
+    def test_engines_write(self):
+        for engine in engines + ['kajiki']:
+            out = []
+            ret = twc.templating.render(
+                '%s:tw2.core.test_templates.simple_%s' % (engine, engine),
+                'string', {'test':'test\u1234'}, write=out.append
+            )
+            assert(ret is None)
+            eq_(''.join(out), '<p>TEST test\u1234</p>')
+
+    def test_display_to(self):
+        for engine in engines + ['kajiki']:
+            mw = twc.make_middleware(None, preferred_rendering_engines=[engine])
+            leaf = twc.Widget(template='<i>${w.value}</i>' if engine != 'jinja'
+                              else '<i>{{ w.value }}</i>',
+                              inline_engine_name=engine)
+            w = twc.CompoundWidget(
+                id='f', separator='<hr/>',
+                template='%s:tw2.core.templates.display_children' % engine,
+                children=[leaf(id='a', value='<a>'), leaf(id='b', value=2)])
+            testapi.request(1, mw)
+            expected = w.display()
+            testapi.request(2, mw)
+            out = []
+            assert(w.display_to(out.append) is None)
+            eq_(''.join(out), expected)
+
+    def test_mako_display_to_context(self):
+        leaf = twc.Widget(template='<i>${w.value}</i>', inline_engine_name='mako')
+        w = twc.CompoundWidget(
+            id='f', inline_engine_name='mako',
+            template='<%namespace name="tw" module="tw2.core.mako_util"/>'
+                     '<p>${tw.display(w.children[0], displays_on="mako")}|'
+                     '${w.children[1].display(displays_on="mako")}</p>',
+            children=[leaf(id='a', value='<a>'), leaf(id='b', value=2)])
+        out = []
+        w.display_to(out.append)
+        eq_(''.join(out), '<p><i>&lt;a&gt;</i>|<i>2</i></p>')
+        assert('&lt;a&gt;' in out)
+        eq_(w.req().display(), '<p><i>&lt;a&gt;</i>|<i>2</i></p>')
+
+    def test_genshi_streams(self):
+        import genshi
+        leaf = twc.Widget(template='<i>${w.value}</i>', inline_engine_name='genshi')
+        w = twc.CompoundWidget(
+            id='f', template='genshi:tw2.core.templates.display_children',
+            children=[leaf(id='a', value='<a>'), leaf(id='b', value=2)])
+        outputs = []
+        for streams in (True, False):
+            mw = twc.make_middleware(None, genshi_streams=streams)
+            testapi.request(1, mw)
+            parent = w.req()
+            out = parent.children[0].display(displays_on='genshi')
+            eq_(isinstance(out, genshi.Stream), streams)
+            testapi.request(2, mw)
+            outputs.append(w.display(displays_on='string'))
+        assert(isinstance(outputs[0], six.text_type))
+        eq_(outputs[0], outputs[1])
+        assert('<i>&lt;a&gt;</i>' in outputs[0])
+
+    def test_genshi_streams_top_level(self):
+        # A widget displayed on its own is serialized, even on Genshi.
+        mw = twc.make_middleware(None, default_engine='genshi')
+        testapi.request(1, mw)
+        w = twc.CompoundWidget(
+            id='f', template='genshi:tw2.core.templates.display_children',
+            children=[twc.Widget(id='a', template='<i>${w.value}</i>',
+                                 inline_engine_name='genshi', value='<a>')])
+        for out in (w.display(), w.display(displays_on='genshi')):
+            assert(isinstance(out, six.text_type))
+            assert('<i>&lt;a&gt;</i>' in out)
+
     def test_engines_unicode(self):
         for engine in engines:
             print("Testing %s..." % engine)
@@ -211,12 +285,64 @@ class TestTemplate(unittest.TestCase):
 
         #flush caches to avoid wrong results due to cached results
         twc.util.flush_memoization()
-        twc.templating.engine_name_cache = {}
+        twc.templating.engine_name_cache.clear()
 
         mw = twc.make_middleware(None, preferred_rendering_engines=['genshi', 'jinja'],
                                        rendering_extension_lookup={'genshi':['genshi'],
                                                                    'jinja':['jinja', 'html']})
         assert twc.templating.get_engine_name('tw2.core.test_templates.parent_genshi', mw) == 'jinja'
 
+    def test_template_index(self):
+        listed = []
+        listdir = os.listdir
+
+        def counting_listdir(path):
+            listed.append(path)
+            return listdir(path)
+
+        twc.util.flush_memoization()
+        twc.templating.engine_name_cache.clear()
+        twc.templating.template_index.clear()
+        mw = twc.make_middleware(None, preferred_rendering_engines=['chameleon', 'jinja', 'mako'])
+        os.listdir = counting_listdir
+        try:
+            twc.templating.index_templates('tw2.core.test_templates')
+            for name in ('simple', 'simple_mako', 'simple_jinja', 'parent_genshi'):
+                twc.templating.get_engine_name('tw2.core.test_templates.' + name, mw)
+        finally:
+            os.listdir = listdir
+        eq_(len(listed), 1)
+        eq_(twc.templating.get_engine_name('tw2.core.test_templates.simple', mw), 'chameleon')
+        eq_(twc.templating.get_engine_name('tw2.core.test_templates.simple_mako', mw), 'mako')
+        eq_(twc.templating.get_engine_name('tw2.core.test_templates.simple_jinja', mw), 'jinja')
+        eq_(twc.templating.get_engine_name('tw2.core.test_templates.parent_genshi', mw), 'jinja')
+
+    def test_engine_per_middleware(self):
+        name = 'tw2.core.test_templates.simple'
+        mako = twc.make_middleware(None, preferred_rendering_engines=['mako'])
+        jinja = twc.make_middleware(None, preferred_rendering_engines=['jinja'])
+        eq_(twc.templating.get_engine_name(name, mako), 'mako')
+        eq_(twc.templating.get_engine_name(name, jinja), 'jinja')
+        eq_(twc.templating.get_engine_name(name, mako), 'mako')
+
+        mako.config.preferred_rendering_engines = ['chameleon']
+        eq_(twc.templating.get_engine_name(name, mako), 'mako')
+        twc.templating.clear_engine_names(mako)
+        eq_(twc.templating.get_engine_name(name, mako), 'chameleon')
+        eq_(twc.templating.get_engine_name(name, jinja), 'jinja')
+
+    def test_middlewares_not_kept(self):
+        refs = []
+        for engine in ('mako', 'jinja', 'kajiki'):
+            mw = twc.make_middleware(None, preferred_rendering_engines=[engine])
+            twc.templating.render('tw2.core.test_templates.simple', 'string',
+                                  {'w': None}, mw=mw)
+            refs.append(weakref.ref(mw))
+        del mw
+        # The last one is still the middleware of the current request.
+        twc.core.request_local().pop('middleware')
+        gc.collect()
+        eq_([r() for r in refs], [None, None, None])
+
 if __name__ == '__main__':
     unittest.main()
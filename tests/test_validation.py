@@ -3,6 +3,7 @@ from __future__ import with_statement
 import sys
 from unittest import TestCase
 from nose.tools import eq_, raises
+import webob
 from webob.multidict import MultiDict
 
 import tw2.core as twc, testapi
@@ -25,6 +26,14 @@ repeating_widget = twc.RepeatingWidget(id='a', child=
     twc.Widget(validator=twc.Validator(required=True))
 )
 
+repeating_compound_widget = twc.RepeatingWidget(id='a', child=
+    twc.CompoundWidget(children=[
+        twc.Widget(id='b', validator=IntValidator(required=True)),
+        twc.Widget(id='c'),
+        twc.Widget(id='d', validator=MatchValidator('c')),
+    ])
+)
+
 compound_keyed_widget = twc.CompoundWidget(id='a', children=[
     twc.Widget(id='b', key='x', validator=twc.Validator(required=True)),
     twc.Widget(id='c', key='y', validator=formencode.validators.OpenId()
@@ -46,6 +55,29 @@ class TestValidationError(tb.WidgetTest):
         e = ValidationError('f1')
         eq_(e.message,'s1')
 
+    def test_args_formatted(self):
+        e = ValidationError('required')
+        eq_(e.args[0], 'Enter a value')
+        assert(repr(e).startswith("ValidationError('Enter a value'"))
+
+    def test_msg_formatted_once(self):
+        class DollarValidator(twc.Validator):
+            msgs = {'bad': 'Bad $val'}
+            val = '$required'
+
+            def _validate_python(self, value, state=None):
+                raise ValidationError('bad', self)
+
+        test = twc.CompoundWidget(id='a', children=[
+            twc.Widget(id='b', validator=DollarValidator()),
+        ])
+        self.request(1, self.mw)
+        try:
+            test.validate({'a:b': 'x'})
+            assert(False)
+        except ValidationError as e:
+            eq_(e.widget.children.b.error_msg, 'Bad $required')
+
 
 def _test_stupid_fe_import_requirement():
     "i tried, but seriously, sometimes 100% coverage aint worth it"
@@ -131,6 +163,20 @@ class TestValidation(TestCase):
         assert(twc.validation.unflatten_params({'a:1':20, 'a:x':10}) ==
             {'a':{'1':20, 'x':10}})
 
+    def test_unflatten_does_not_modify_params(self):
+        params = {'a:0': six.b('x'), 'a:1': six.b('y'), 'b': {'1': 'z'}}
+        out = twc.validation.unflatten_params(params)
+        eq_(out, {'a': [six.u('x'), six.u('y')], 'b': ['z']})
+        eq_(params, {'a:0': six.b('x'), 'a:1': six.b('y'), 'b': {'1': 'z'}})
+
+    def test_unflatten_nested_lists(self):
+        out = twc.validation.unflatten_params({
+            'g:10:a': 'z', 'g:2:a': 'w', 'g:0:a': 'x', 'g:0:b': 'y',
+            ':a:b': 'e',
+        })
+        eq_(out, {'g': [{'a': 'x', 'b': 'y'}, {'a': 'w'}, {'a': 'z'}],
+                  '': {'a': {'b': 'e'}}})
+
     def test_compound_validation(self):
         """ Tests that compound widgets can do validation
 
@@ -398,6 +444,221 @@ class TestValidation(TestCase):
         assert(rw.children[0].value == 'test')
         assert('Enter a value' == rw.children[1].error_msg)
 
+    def test_rw_batch_pass(self):
+        testapi.request(1)
+        assert(repeating_compound_widget._batch_columns is not None)
+        inp = [{'b': '1', 'c': 'x', 'd': 'x'}, {'b': '2', 'c': ''}]
+        out = repeating_compound_widget.validate({'a': inp})
+        eq_(out, [{'b': 1, 'c': 'x', 'd': 'x'}, {'b': 2, 'c': '', 'd': ''}])
+        rw = twc.core.request_local()['validated_widget']
+        eq_(rw.children._repetition_cache, {})
+
+    def test_rw_batch_child_fail(self):
+        testapi.request(1)
+        inp = [{'b': '1', 'c': 'x', 'd': 'x'},
+               {'b': 'z', 'c': 'x', 'd': 'y'},
+               {'b': '3', 'c': ''}]
+        try:
+            repeating_compound_widget.validate({'a': inp})
+            assert(False)
+        except twc.ValidationError:
+            pass
+        rw = twc.core.request_local()['validated_widget']
+        eq_(list(rw.children._repetition_cache), [1])
+        eq_(rw.children[1].error_msg, '')
+        eq_(rw.children[1].children.b.error_msg, 'Must be an integer')
+        eq_(rw.children[1].children.c.error_msg, None)
+        eq_(rw.children[1].children.d.error_msg, 'Must match C')
+        eq_(rw.children[0].value, inp[0])
+        eq_(rw.children[2].children.c.value, '')
+        assert(rw.children[2]._validated)
+        assert(rw.children[2].children.b._validated)
+        eq_(rw.children[2].children.b.error_msg, None)
+
+    def test_rw_batch_column_call(self):
+        calls = []
+        email = twc.EmailValidator()
+        many = email._validate_many_stateless
+
+        def counting(values):
+            calls.append(values)
+            return many(values)
+
+        email._validate_many_stateless = counting
+        test = twc.RepeatingWidget(id='g', child=twc.CompoundWidget(
+            children=[twc.Widget(id='e', validator=email)]))
+        testapi.request(1)
+        eq_(test.validate({'g:0:e': 'a@b.c', 'g:1:e': ' d@e.f'}),
+            [{'e': 'a@b.c'}, {'e': 'd@e.f'}])
+        eq_(calls, [['a@b.c', ' d@e.f']])
+        try:
+            test.validate({'g:0:e': 'a@b.c', 'g:1:e': 'x'})
+            assert(False)
+        except ValidationError as ve:
+            eq_(ve.widget.children[1].children.e.error_msg,
+                'Must be a valid email address')
+        eq_(len(calls), 2)
+
+    def test_rw_batch_not_used(self):
+        not_leaf = twc.RepeatingWidget(child=twc.CompoundWidget(children=[
+            twc.CompoundWidget(id='x', children=[twc.Widget(id='y')]),
+        ]))
+        assert(not_leaf._batch_columns is None)
+        validated = twc.RepeatingWidget(child=twc.CompoundWidget(
+            validator=twc.Validator(), children=[twc.Widget(id='y')],
+        ))
+        assert(validated._batch_columns is None)
+
+    def test_validation_plan(self):
+        test = twc.CompoundWidget(id='a', children=[
+            twc.CompoundWidget(children=[twc.Widget(id='b')]),
+            twc.DisplayOnlyWidget(child=twc.Widget(id='c',
+                validator=IntValidator())),
+            twc.RepeatingWidget(id='d', child=twc.Widget()),
+        ])
+        testapi.request(1)
+        out = test.validate({'a:b': 'x', 'a:c': '1', 'a:d:0': 'y'})
+        assert(test._validation_plan is not None)
+        assert(out == {'b': 'x', 'c': 1, 'd': ['y']})
+        vw = twc.core.request_local()['validated_widget']
+        assert(vw.children[0].children.b.value == 'x')
+        assert(vw.children[1].child.value == '1')
+        assert(vw.children[2].children[0].value == 'y')
+
+    def test_validation_plan_errors(self):
+        calls = []
+
+        class CountingValidator(IntValidator):
+            def _convert_to_python(self, value, state=None):
+                calls.append(value)
+                return super(CountingValidator,
+                             self)._convert_to_python(value, state)
+
+        class CountingCompound(twc.Validator):
+            def _validate_python(self, value, state=None):
+                calls.append('compound')
+
+        test = twc.CompoundWidget(id='a', validator=CountingCompound(),
+                                  children=[
+            twc.Widget(id='b', validator=CountingValidator()),
+            twc.CompoundWidget(id='c', children=[
+                twc.Widget(id='d', validator=CountingValidator()),
+            ]),
+            twc.RepeatingWidget(id='e', validator=CountingCompound(),
+                                child=twc.Widget(
+                                    validator=CountingValidator())),
+            twc.RepeatingWidget(id='f', child=twc.CompoundWidget(children=[
+                twc.Widget(id='g', validator=CountingValidator()),
+            ])),
+            twc.RepeatingWidget(id='h', child=twc.RepeatingWidget(
+                child=twc.Widget(validator=CountingValidator()))),
+        ])
+        testapi.request(1)
+        try:
+            test.validate({'a:b': 'x', 'a:c:d': '1', 'a:e:0': '2',
+                           'a:e:1': 'y', 'a:f:0:g': 'z', 'a:f:1:g': '3',
+                           'a:h:0:0': '4', 'a:h:0:1': 'w'})
+            assert(False)
+        except ValidationError as ve:
+            w = ve.widget
+        assert(sorted(calls) == sorted(['x', '1', '2', 'y', 'z', '3', '4',
+                                        'w', 'compound', 'compound']))
+        assert(w.children.b.error_msg == 'Must be an integer')
+        assert(w.children.c.children.d.error_msg is None)
+        assert(w.children.e.children[1].error_msg == 'Must be an integer')
+        assert(w.children.f.children[0].children.g.error_msg ==
+               'Must be an integer')
+        assert(w.children.h.children[0].children[1].error_msg ==
+               'Must be an integer')
+
+    def test_validation_plan_not_used(self):
+        class Custom(twc.Widget):
+            def _validate(self, value, state=None):
+                return 'custom'
+
+        test = twc.CompoundWidget(id='a', children=[Custom(id='b')])
+        testapi.request(1)
+        assert(test.validate({'a:b': 'x'}) == {'b': 'custom'})
+        assert(test._validation_plan is None)
+
+    def test_validation_plan_init_validator(self):
+        class Dyn(twc.Widget):
+            def __init__(self, **kw):
+                super(Dyn, self).__init__(**kw)
+                self.validator = IntValidator(required=True)
+
+        test = twc.CompoundWidget(id='f', children=[Dyn(id='d')])
+        testapi.request(1)
+        try:
+            test.validate({'f:d': ''})
+            assert(False)
+        except ValidationError as ve:
+            assert(ve.widget.children.d.error_msg == 'Enter a value')
+        assert(test._validation_plan is None)
+
+    def test_validate_stream(self):
+        testapi.request(1)
+        fields = [('a:b', 'test'), ('a:c', 'test2')]
+        assert(compound_widget.validate_stream(fields) ==
+               compound_widget.validate(dict(fields)))
+        fields = [('a:0', 'x'), ('a:1', 'y')]
+        assert(repeating_widget.validate_stream(fields) == ['x', 'y'])
+
+    def test_validate_stream_errors(self):
+        testapi.request(1)
+        try:
+            compound_widget.validate_stream([('a:b', 'test'), ('a:c', '')])
+            assert(False)
+        except ValidationError as ve:
+            assert(ve.widget.children.b.error_msg is None)
+            assert(ve.widget.children.c.error_msg == 'Enter a value')
+
+    def test_validate_stream_validates_once(self):
+        calls = []
+
+        class CountingValidator(twc.Validator):
+            def _convert_to_python(self, value, state=None):
+                calls.append(value)
+                return value
+
+        test = twc.CompoundWidget(id='a', children=[
+            twc.Widget(id='b', validator=CountingValidator()),
+            twc.Widget(id='c', validator=MatchValidator('b')),
+        ])
+        testapi.request(1)
+        out = test.validate_stream([('a:b', 'x'), ('a:c', 'x')])
+        assert(out == {'b': 'x', 'c': 'x'})
+        assert(calls == ['x'])
+        # Repeated names are validated in the final pass
+        del calls[:]
+        test = twc.CompoundWidget(id='a', children=[
+            twc.Widget(id='b', validator=CountingValidator()),
+        ])
+        out = test.validate_stream([('a:b', 'x'), ('a:b', 'y')])
+        assert(out['b'] == ['x', 'y'])
+        assert(calls == ['x', ['x', 'y']])
+        # The cells of a grid too
+        del calls[:]
+        test = twc.RepeatingWidget(id='g', child=twc.CompoundWidget(
+            children=[twc.Widget(id='c', validator=CountingValidator())]))
+        out = test.validate_stream([('g:0:c', 'x'), ('g:1:c', 'y')])
+        assert(out == [{'c': 'x'}, {'c': 'y'}])
+        assert(calls == ['x', 'y'])
+
+    def test_validate_stream_request(self):
+        testapi.request(1)
+        req = webob.Request.blank('/', POST={'a:b': 'test', 'a:c': 'test2'})
+        out = compound_widget.validate_stream(req)
+        assert(out == {'b': 'test', 'c': 'test2'})
+
+    def test_validate_stream_request_parsed(self):
+        testapi.request(1)
+        req = webob.Request.blank('/', POST={'a:b': 'test', 'a:c': 'test2'})
+        # The framework has already read the body.
+        assert(req.POST['a:b'] == 'test')
+        out = compound_widget.validate_stream(req)
+        assert(out == {'b': 'test', 'c': 'test2'})
+
     def test_display_only_widget(self):
         test = twc.DisplayOnlyWidget(child=compound_widget)
         testapi.request(1)
@@ -638,6 +899,75 @@ class TestValidatorMisc(TestCase):
         except ValidationError as ve:
             self.assert_(ve.message.startswith(v.msgs["badnetblock"][:5]))
 
+    def testIPv6AddressValidator(self):
+        v = IpAddressValidator()
+        self.assertRaises(ValidationError, v.to_python, '::1')
+        v = IpAddressValidator(allow_ipv6=True, allow_netblock=True)
+        eq_(v.to_python('2001:db8::1'), '2001:db8::1')
+        eq_(v.to_python('2001:db8::/32'), '2001:db8::/32')
+        eq_(v.to_python('10.0.0.0/8'), '10.0.0.0/8')
+        for value in ('2001:db8::g', '2001:db8::/x', '1.2.3.256', '::1/',
+                      '1.2.3.4/'):
+            try:
+                v.to_python(value)
+                self.assert_(False)
+            except ValidationError as ve:
+                eq_(ve.message, v.msgs['badipaddress'])
+        try:
+            v.to_python('2001:db8::/129')
+            self.assert_(False)
+        except ValidationError as ve:
+            eq_(ve.message, v.msgs['badnetblock'])
+
+    def testParseDatetime(self):
+        for value, format in (
+                ('2024-02-29', '%Y-%m-%d'),
+                ('9/3/2024', '%d/%m/%Y'),
+                ('2024-01-02t03:04:05.25', '%Y-%m-%dT%H:%M:%S.%f'),
+                ('2024-01-02   3:04', '%Y-%m-%d %H:%M'),
+                ('Jan 2024', '%b %Y')):
+            eq_(twc.validation.parse_datetime(value, format),
+                datetime.datetime.strptime(value, format))
+        for value in ('2024-02-30', '2024-01-01x', '2024-1'):
+            self.assertRaises(ValueError, twc.validation.parse_datetime,
+                              value, '%Y-%m-%d')
+
+    def testDateTimeValidatorMemo(self):
+        v = DateValidator()
+        eq_(v.to_python('2024-01-02'), datetime.date(2024, 1, 2))
+        eq_(v.to_python('2024-01-02'), datetime.date(2024, 1, 2))
+        v2 = v.clone(format='%Y-%d-%m')
+        eq_(v2.to_python('2024-01-02'), datetime.date(2024, 2, 1))
+        self.assertRaises(ValidationError, v.to_python, '2024-02-30')
+
+        class NoInit(DateValidator):
+            def __init__(self, **kw):
+                self.format = '%d/%m/%Y'
+
+        eq_(NoInit().to_python('02/01/2024'), datetime.date(2024, 1, 2))
+
+    def testValidateMany(self):
+        v = EmailValidator(required=True)
+        eq_(v.validate_many([' a@b.com', 'nope', '']),
+            ['a@b.com', twc.Invalid, twc.Invalid])
+        v = IpAddressValidator(allow_netblock=True)
+        eq_(v.validate_many(['1.2.3.4', '1.2.3.4/33', '', 'x']),
+            ['1.2.3.4', twc.Invalid, None, twc.Invalid])
+        eq_(v.validate_many(['0001.2.3.004', '0256.0.0.1']),
+            ['0001.2.3.004', twc.Invalid])
+        v = IpAddressValidator(allow_ipv6=True, allow_netblock=True)
+        eq_(v.validate_many(['::1/', '::1/128']), [twc.Invalid, '::1/128'])
+        v = RegexValidator(regex='^a+$')
+        assert(v.regex is RegexValidator(regex='^a+$').regex)
+        eq_(v.validate_many(['aa', 'ab']), ['aa', twc.Invalid])
+
+        class Upper(EmailValidator):
+            def _convert_to_python(self, value, state=None):
+                return value.upper()
+
+        eq_(Upper().validate_many(['a@b.com', 'x']), ['A@B.COM', twc.Invalid])
+        eq_(IntValidator().validate_many(['1', 'x']), [1, twc.Invalid])
+
     def testMatchValidator(self):
         v = MatchValidator(other_field="foo")
 
@@ -771,6 +1101,82 @@ class TestValidatorMisc(TestCase):
         except ValidationError as ve:
             self.assert_(False, ve.message)
 
+    def testNestedCompoundValidatorsFlattened(self):
+        length = twc.StringLengthValidator(max=9)
+        email = twc.EmailValidator()
+        v = All(All(length, email), twc.UrlValidator)
+        eq_(v.validators[:2], [length, email])
+        eq_(len(v.validators), 3)
+        v = Any(All(length, email), Any(email))
+        eq_(len(v.validators), 2)
+
+    def testSpecializedToPython(self):
+        class Upper(Validator):
+            def _convert_to_python(self, value, state=None):
+                return value.upper()
+
+        class Custom(Upper):
+            def to_python(self, value, state=None):
+                return 'custom'
+
+        class Empty(Upper):
+            @staticmethod
+            def _is_empty(value):
+                return value == 'nothing'
+
+        eq_(Upper().to_python(' a '), 'A')
+        eq_(Upper(strip=False).to_python(' a '), ' A ')
+        eq_(Upper(if_empty='e').to_python(''), 'e')
+        eq_(Custom().to_python('a'), 'custom')
+        eq_(Empty().to_python(''), '')
+        eq_(Empty(if_empty='e').to_python('nothing'), 'e')
+        v = Upper()
+        v.required = True
+        self.assertRaises(ValidationError, v.to_python, [])
+
+    def testSpecializedToPythonSuper(self):
+        class A(Validator):
+            def _convert_to_python(self, value, state=None):
+                return value.lower()
+
+        class B(A):
+            def to_python(self, value, state=None):
+                return super(B, self).to_python(value, state)
+
+            def _validate_python(self, value, state=None):
+                raise ValidationError('never', self)
+
+        eq_(A().to_python('A'), 'a')
+        self.assertRaises(ValidationError, B().to_python, 'A')
+
+    def testSpecializedToPythonInstanceHooks(self):
+        def _validate_python(value, state=None):
+            raise ValidationError('never', v)
+
+        v = IntValidator()
+        eq_(v.to_python('3'), 3)
+        v._validate_python = _validate_python
+        self.assertRaises(ValidationError, v.to_python, '3')
+
+    def testSpecializedToPythonPatchedHooks(self):
+        class V(twc.Validator):
+            pass
+
+        class W(V):
+            pass
+
+        def strict(self, value, state=None):
+            raise ValidationError('never', self)
+
+        V._validate_python = strict
+        self.assertRaises(ValidationError, V().to_python, 'x')
+        self.assertRaises(ValidationError, W().to_python, 'x')
+        del V._validate_python
+        eq_(V().to_python('x'), 'x')
+        eq_(W().to_python('x'), 'x')
+        V.to_python = lambda self, value, state=None: 'patched'
+        eq_(W().to_python('x'), 'patched')
+
 
 def test_deprecation_of_validate_python():
 
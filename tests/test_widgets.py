@@ -69,6 +69,52 @@ class TestWidgets(object):
         test.prepare()
         assert(test.attrs['test'] == 'wibble')
 
+    def test_attrs_shared(self):
+        cls = twc.Widget(template='test', attrs={'a': 'b'})
+        test = cls.req()
+        test.prepare()
+        assert(test.attrs is not cls.attrs)
+        eq_(test.attrs, cls.attrs)
+        test.attrs['x'] = 'y'
+        eq_(test.attrs, {'a': 'b', 'x': 'y'})
+        eq_(cls.attrs, {'a': 'b'})
+
+    def test_attrs_changed_in_prepare(self):
+        class W(twc.Widget):
+            template = '<%namespace name="tw" module="tw2.core.mako_util"/>' \
+                       '<p ${tw.attrs(attrs=w.attrs)}></p>'
+            inline_engine_name = 'mako'
+
+            def prepare(self):
+                super(W, self).prepare()
+                self.attrs['data-secret'] = self.value
+                self.attrs.update({'title': self.value})
+
+        eq_(W.display(value='first'),
+            '<p data-secret="first" title="first"></p>')
+        eq_(W.display(value='second'),
+            '<p data-secret="second" title="second"></p>')
+        eq_(W.display(), '<p ></p>')
+        eq_(W.attrs, {})
+
+    def test_attrs_not_shared(self):
+        test = Test6(template='test', test='wibble').req()
+        test.prepare()
+        assert(test.attrs is not Test6.attrs)
+        assert('test' not in Test6.attrs)
+
+    def test_attrs_not_copied(self):
+        cls = twc.Widget(id='x', template='test', css_class='c',
+                         attrs={'a': 'b'})
+        test = cls.req()
+        test.prepare()
+        eq_(test.attrs, {'a': 'b', 'id': 'x', 'class': 'c'})
+        assert(test.attrs._data is cls.attrs)
+        eq_(test.attrs._extra, {'class': 'c'})
+        test.attrs['class'] = 'd'
+        eq_(test.attrs, {'a': 'b', 'id': 'x', 'class': 'd'})
+        eq_(cls.attrs, {'a': 'b', 'id': 'x'})
+
     def test_attribute_clash(self):
         test = Test6(id='test', template='test', test='wibble').req()
         test.attrs = {'test':'blah'}
@@ -85,6 +131,22 @@ class TestWidgets(object):
         ins.prepare()
         assert(ins.template == 'test')
 
+    def test_deferred_names(self):
+        class Mixin(object):
+            value = twc.Deferred(lambda: 'value')
+        test = twc.Widget(id='test', template=twc.Deferred(lambda: 'test'))
+        eq_(test._deferred, ['template'])
+        eq_(test(template='test')._deferred, [])
+        sub = type('Sub', (Mixin, test), {})
+        eq_(sub._deferred, ['template', 'value'])
+
+    def test_deferred_late(self):
+        test = twc.Widget(id='test', template="${w.value}",
+                          inline_engine_name="mako")
+        for i in range(2):
+            eq_(test.display(value=twc.Deferred(lambda: 'x')), 'x')
+        eq_(test._deferred, [])
+
     def test_deferred_value_no_subclass(self):
         test = twc.Widget(id='test',
                           template="<p>${w.value}</p>",
@@ -395,6 +457,35 @@ class TestPage(tb.WidgetTest):
 <body><h1>some title</h1></body>
 </html>""")
 
+    def test_request_streaming(self):
+        class Form(twc.CompoundWidget):
+            resources = [twc.CSSLink(link='/a.css'),
+                         twc.JSLink(link='/a.js', location='bodybottom')]
+            a = twc.Widget(template='<i>a</i>', inline_engine_name='mako',
+                           resources=[twc.CSSLink(link='/b.css')])
+            b = twc.Widget(template='<i>b</i>', inline_engine_name='mako')
+
+        class Streamed(wd.Page):
+            title = 'some title'
+            child = Form
+            streaming = True
+
+        class Whole(Streamed):
+            streaming = False
+
+        mw = twc.make_middleware(None, controller_prefix='/c/')
+        mw.controllers.register(Streamed, 'streamed')
+        mw.controllers.register(Whole, 'whole')
+        resp = Request.blank('/c/streamed').get_response(mw)
+        chunks = list(resp.app_iter)
+        assert(len(chunks) > 2)
+        assert(b'/a.css' in chunks[0] and b'/b.css' in chunks[0])
+        assert(b'<i>' not in chunks[0])
+        assert(b'/a.js' in chunks[-1])
+        whole = Request.blank('/c/whole').get_response(mw).body
+        eq_(b''.join(chunks), whole)
+        eq_(twc.core.request_local(), {})
+
 
 class TestWidgetMisc(TestCase):
     def setUp(self):
@@ -506,6 +597,21 @@ class TestWidgetMisc(TestCase):
         self.assert_(res)
         self.assert_(i.resources)
 
+    def testJsCallsNotAllocatedPerInstance(self):
+        class T(wd.Widget):
+            template = 'mako:tw2.core.test_templates.simple_mako'
+
+        i = T(id="foo").req()
+        self.assert_("_js_call_list" not in i.__dict__)
+        i.add_call("somefunc")
+        self.assert_(["somefunc", "bodybottom"] in i._js_calls)
+        self.assert_(not T.req()._js_calls)
+
+        i = T(id="foo").req()
+        i._js_calls.append(["otherfunc", "head"])
+        self.assert_(i._js_calls == [["otherfunc", "head"]])
+        self.assert_(not T.req()._js_calls)
+
     def testSafeModify(self):
         """
         this method isn't called anywhere in the code, so not sure
@@ -649,6 +755,73 @@ class TestRepeatingWidget(TestCase):
         self.assert_(i.children[0]._prepared)
 
 
+    def testStreamingFromIterator(self):
+        class K(wd.Widget):
+            template = "${w.value}"
+            inline_engine_name = "mako"
+
+        class T(wd.RepeatingWidget):
+            id = 'foo'
+            child = K
+            streaming = True
+            extra_reps = 1
+
+        class NotStreaming(T):
+            streaming = False
+
+        testapi.request(1, twc.make_middleware(None))
+        out = T.display(value=(str(i) for i in range(3)))
+        self.assertEquals(out, NotStreaming.display(value=['0', '1', '2']))
+
+    def testStreamingDoesNotKeepChildren(self):
+        class T(wd.RepeatingWidget):
+            child = wd.Widget(template="")
+            streaming = True
+
+        i = T().req(value=iter(['a', 'b']))
+        i.prepare()
+        self.assert_(isinstance(i.children, wd.StreamingRepeatingWidgetBunch))
+        children = list(i.children)
+        self.assertEquals([c.value for c in children], ['a', 'b'])
+        self.assertEquals([c.compound_id for c in children],
+                          ['0', '1'])
+        self.assert_(children[0] is not i.children[0])
+        self.assertEquals(list(i.children), [])
+
+    def testStreamingMaxRepetitions(self):
+        class T(wd.RepeatingWidget):
+            child = wd.Widget(template="")
+            streaming = True
+            max_reps = 2
+
+        i = T().req(value=iter(['a', 'b', 'c']))
+        i.prepare()
+        self.assertEquals([c.value for c in i.children], ['a', 'b'])
+
+    def testRepetitionCacheBounded(self):
+        class T(wd.RepeatingWidget):
+            child = wd.Widget
+            repetition_cache_size = 2
+
+        first = T.rwbc[0]
+        T.rwbc[1]
+        self.assert_(T.rwbc[0] is first)
+        T.rwbc[2]
+        self.assertEquals(len(T.rwbc._repetition_cache), 2)
+        self.assert_(T.rwbc[2].repetition == 2)
+        self.assert_(T.rwbc[0] is first)
+        self.assert_(1 not in T.rwbc._repetition_cache)
+        self.assert_(T.rwbc[1].compound_id == '1')
+
+    def testRepetitionCacheUnbounded(self):
+        class T(wd.RepeatingWidget):
+            child = wd.Widget
+            repetition_cache_size = None
+
+        for i in range(5):
+            T.rwbc[i]
+        self.assertEquals(len(T.rwbc._repetition_cache), 5)
+
     def testValidator(self):
         class V(vd.Validator):
             def to_python(self, data, state=None):
@@ -0,0 +1,211 @@
+"""
+Compare the template engines on a widget tree.
+
+The core templates, and those of most widget libraries, come in a flavor for
+each engine, and the middleware picks the first engine of its
+``preferred_rendering_engines`` that has a flavor of a template. This module
+renders a widget tree with each installed engine in turn, measures the time
+and peak memory of a render, and recommends an order of preference, fastest
+first::
+
+    python -m tw2.core.enginebench myapp.widgets:MyForm
+
+or, from Python::
+
+    results = enginebench.benchmark_engines(MyForm)
+    print(enginebench.recommend(results))
+
+Templates named with an explicit engine, such as ``mako:myapp.templates.x``,
+are rendered by that engine whatever the preference. Benchmarking resets the
+process-wide template caches, so run it on its own rather than inside a
+serving application.
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import gc
+import json
+import sys
+import timeit
+
+from . import core
+from . import middleware
+from . import templating
+from . import util
+
+try:
+    import tracemalloc
+except ImportError:
+    # py2
+    tracemalloc = None
+
+#: The modules each engine needs.
+ENGINE_MODULES = {
+    'mako': 'mako',
+    'genshi': 'genshi',
+    'jinja': 'jinja2',
+    'kajiki': 'kajiki',
+    'chameleon': 'chameleon',
+}
+
+EngineResult = collections.namedtuple(
+    'EngineResult', ['engine', 'seconds', 'peak_memory', 'error'])
+EngineResult.__doc__ = """
+The result of rendering a widget tree with one engine: the best `seconds`
+per render, the `peak_memory` in bytes allocated while rendering (None
+where tracemalloc is not available), or the `error` that made it fail.
+"""
+
+
+def installed_engines():
+    """ The engines whose modules can be imported, in alphabetical order. """
+    out = []
+    for engine in sorted(ENGINE_MODULES):
+        try:
+            __import__(ENGINE_MODULES[engine])
+        except ImportError:
+            pass
+        else:
+            out.append(engine)
+    return out
+
+
+def _reset_caches():
+    templating.engine_name_cache.clear()
+    util.flush_memoization()
+
+
+def benchmark_engines(widget, engines=None, number=None, repeat=3, **kw):
+    """
+    Render `widget`, a widget class or instance, with each of `engines`
+    (default: all installed) preferred, and return an :class:`EngineResult`
+    for each, fastest first. Engines that failed come last. Keyword
+    arguments are passed to :meth:`tw2.core.Widget.display`.
+    """
+    installed = installed_engines()
+    rl = core.request_local()
+    saved = dict(rl)
+    results = []
+    try:
+        for engine in engines or installed:
+            if engine not in installed:
+                results.append(EngineResult(engine, float('inf'), None,
+                                            'not installed'))
+                continue
+            results.append(_benchmark(widget, engine, number, repeat, kw))
+    finally:
+        _reset_caches()
+        rl.clear()
+        rl.update(saved)
+    results.sort(key=lambda r: (r.error is not None, r.seconds))
+    return results
+
+
+def _benchmark(widget, engine, number, repeat, kw):
+    _reset_caches()
+    mw = middleware.make_middleware(
+        None,
+        preferred_rendering_engines=[engine],
+        strict_engine_selection=True,
+        auto_reload_templates=False,
+    )
+    rl = core.request_local()
+
+    def render():
+        rl.clear()
+        rl['middleware'] = mw
+        return widget.display(**kw)
+
+    try:
+        # The first render compiles the templates, which is not measured.
+        render()
+    except Exception as e:
+        return EngineResult(engine, float('inf'), None,
+                            '%s: %s' % (type(e).__name__, e))
+
+    timer = timeit.Timer(render)
+    if number is None:
+        number = _autorange(timer)
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    peak = None
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            render()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return EngineResult(engine, seconds, peak, None)
+
+
+def _autorange(timer):
+    """ A number of renders that takes at least 0.2 seconds. """
+    number = 1
+    while True:
+        if timer.timeit(number) >= 0.2:
+            return number
+        number *= 10
+
+
+def recommend(results):
+    """
+    A ``preferred_rendering_engines`` list for `results`, as returned by
+    :func:`benchmark_engines`: the engines that rendered the tree, fastest
+    first.
+    """
+    return [r.engine for r in sorted(results, key=lambda r: r.seconds)
+            if r.error is None]
+
+
+def _load(path):
+    """ The object named by `path`, of the form ``package.module:name``. """
+    modname, _, attr = path.partition(':')
+    obj = __import__(modname, fromlist=['*'])
+    for name in filter(None, attr.split('.')):
+        obj = getattr(obj, name)
+    return obj
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render a widget with each template engine, and '
+                    'recommend preferred_rendering_engines.')
+    parser.add_argument('widget', help='the widget, as package.module:Name')
+    parser.add_argument('--engines', nargs='+', metavar='ENGINE',
+                        help='engines to compare (default: all installed)')
+    parser.add_argument('--value', type=json.loads,
+                        help='a JSON value to display the widget with')
+    parser.add_argument('--number', type=int,
+                        help='renders per timing (default: automatic)')
+    args = parser.parse_args(argv)
+
+    kw = {}
+    if args.value is not None:
+        kw['value'] = args.value
+    results = benchmark_engines(_load(args.widget), args.engines,
+                                number=args.number, **kw)
+
+    print('%-10s %12s %12s %14s' % ('engine', 'ms/render', 'renders/s',
+                                    'peak memory'))
+    for r in results:
+        if r.error is not None:
+            print('%-10s failed: %s' % (r.engine, r.error))
+            continue
+        memory = '-' if r.peak_memory is None else \
+            '%.1f KiB' % (r.peak_memory / 1024.0)
+        print('%-10s %12.3f %12.1f %14s' % (r.engine, r.seconds * 1000,
+                                            1 / r.seconds, memory))
+
+    engines = recommend(results)
+    if not engines:
+        print('\nNo engine could render %s' % args.widget)
+        return 1
+    print('\npreferred_rendering_engines = %r' % engines)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Incremental parsing of form submissions.
+
+:func:`iter_form_fields` reads a POST body from a WSGI environ a chunk at a
+time and yields each field as soon as it has been parsed. Used with
+:meth:`tw2.core.Widget.validate_stream`, fields are validated while the rest
+of the body is still being read, and the body is never held in memory as a
+whole.
+"""
+from __future__ import absolute_import
+
+import re
+import tempfile
+
+import six
+
+from . import core
+from . import validation as vd
+
+try:
+    from cgi import FieldStorage as _FieldStorageBase
+except ImportError:
+    _FieldStorageBase = object
+
+if six.PY3:
+    from urllib.parse import unquote_to_bytes as _unquote
+else:
+    from urllib import unquote as _unquote
+
+#: Size of each read from the request body.
+CHUNK_SIZE = 64 * 1024
+#: Uploaded files larger than this are spooled to a temporary file.
+SPOOL_SIZE = 64 * 1024
+#: Default cap on the memory used to buffer fields that are not files.
+MAX_MEMORY = 10 * 1024 * 1024
+#: Cap on the size of the headers of a single multipart part.
+MAX_HEADER_SIZE = 16 * 1024
+
+_option_re = re.compile(r'''\s*(\w+)\*?\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)''')
+
+
+class FieldUpload(_FieldStorageBase):
+    """
+    A file uploaded in a multipart form submission.
+
+    Where the :mod:`cgi` module is available this is a
+    :class:`cgi.FieldStorage`, so validators that check for one accept it.
+
+    `name`
+        The field name
+    `filename`
+        The file name sent by the browser
+    `type`
+        The content type of the file
+    `headers`
+        A dict of the part headers, with lower case names
+    `file`
+        A file object, positioned at the start, with the file content
+    """
+
+    def __init__(self, name, filename, type, headers, file):
+        self.name = name
+        self.filename = filename
+        self.type = type
+        self.headers = headers
+        self.file = file
+        self.list = None
+        self.disposition_options = {}
+
+    @property
+    def value(self):
+        self.file.seek(0)
+        value = self.file.read()
+        self.file.seek(0)
+        return value
+
+    def __repr__(self):
+        return "FieldUpload(%r, %r)" % (self.name, self.filename)
+
+
+def _parse_options(header):
+    """ Split a header like ``form-data; name="a"`` into its value and a
+    dict of its options. """
+    value, _, rest = header.partition(';')
+    options = {}
+    for m in _option_re.finditer(rest):
+        v = m.group(2).strip()
+        if len(v) > 1 and v[0] == v[-1] == '"':
+            v = v[1:-1].replace('\\\\', '\\').replace('\\"', '"')
+        options[m.group(1).lower()] = v
+    return value.strip().lower(), options
+
+
+class _BodyReader(object):
+    """ Reads at most `length` bytes of `stream`, a chunk at a time. """
+
+    def __init__(self, stream, length, chunk_size):
+        self.stream = stream
+        self.remaining = length
+        self.chunk_size = chunk_size
+
+    def read(self):
+        size = self.chunk_size
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return b''
+            size = min(size, self.remaining)
+        chunk = self.stream.read(size)
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        return chunk
+
+
+def _too_large():
+    return vd.ValidationError('toolarge')
+
+
+def _decode(value, encoding):
+    try:
+        return value.decode(encoding)
+    except UnicodeDecodeError:
+        raise vd.ValidationError('decode', vd.Validator(encoding=encoding))
+
+
+def _iter_urlencoded(reader, encoding, max_memory):
+    def field(pair):
+        name, _, value = pair.partition(b'=')
+        return (_decode(_unquote(name.replace(b'+', b' ')), encoding),
+                _decode(_unquote(value.replace(b'+', b' ')), encoding))
+
+    buffered = 0
+    pending = b''
+    while True:
+        chunk = reader.read()
+        if not chunk:
+            break
+        pairs = (pending + chunk).split(b'&')
+        pending = pairs.pop()
+        for pair in pairs:
+            if pair:
+                buffered += len(pair)
+                yield field(pair)
+        if buffered + len(pending) > max_memory:
+            raise _too_large()
+    if pending:
+        yield field(pending)
+
+
+def _iter_multipart(reader, boundary, encoding, max_memory, spool_size):
+    delimiter = b'\r\n--' + boundary
+    # The first boundary is not preceded by a line break.
+    buf = b'\r\n'
+
+    def fill():
+        chunk = reader.read()
+        if not chunk:
+            raise vd.ValidationError('corrupt')
+        return chunk
+
+    # Skip the preamble
+    while True:
+        pos = buf.find(delimiter)
+        if pos >= 0:
+            buf = buf[pos + len(delimiter):]
+            break
+        buf = buf[-len(delimiter):] + fill()
+
+    buffered = 0
+    while True:
+        while len(buf) < 2:
+            buf += fill()
+        if buf[:2] == b'--':
+            return
+        # Part headers
+        while True:
+            pos = buf.find(b'\r\n\r\n')
+            if pos >= 0:
+                break
+            if len(buf) > MAX_HEADER_SIZE:
+                raise _too_large()
+            buf += fill()
+        headers = {}
+        for line in buf[2:pos].split(b'\r\n'):
+            if b':' in line:
+                k, _, v = line.partition(b':')
+                headers[_decode(k, 'latin-1').strip().lower()] = \
+                    _decode(v, encoding).strip()
+        buf = buf[pos + 4:]
+
+        _, options = _parse_options(headers.get('content-disposition', ''))
+        name = options.get('name')
+        filename = options.get('filename')
+        if filename is not None:
+            sink = tempfile.SpooledTemporaryFile(max_size=spool_size)
+            write = sink.write
+        else:
+            sink = []
+
+            def write(data, sink=sink):
+                sink.append(data)
+
+        # Part body, up to the next delimiter
+        while True:
+            pos = buf.find(delimiter)
+            if pos >= 0:
+                data, buf = buf[:pos], buf[pos + len(delimiter):]
+            else:
+                keep = len(delimiter) - 1
+                data, buf = buf[:-keep], buf[-keep:]
+            if filename is None:
+                buffered += len(data)
+                if buffered > max_memory:
+                    raise _too_large()
+            if data:
+                write(data)
+            if pos >= 0:
+                break
+            buf += fill()
+
+        if name is None:
+            continue
+        if filename is not None:
+            sink.seek(0)
+            yield name, FieldUpload(
+                name, filename,
+                headers.get('content-type', 'application/octet-stream'),
+                headers, sink)
+        else:
+            yield name, _decode(b''.join(sink), encoding)
+
+
+def iter_form_fields(environ, encoding=None, max_memory=None,
+                     chunk_size=CHUNK_SIZE, spool_size=SPOOL_SIZE):
+    """
+    Parse the form submitted in the body of a WSGI request, yielding
+    ``(name, value)`` pairs as they are read.
+
+    Both ``application/x-www-form-urlencoded`` and ``multipart/form-data``
+    bodies are supported. Values are decoded with `encoding`, which defaults
+    to the middleware's. Uploaded files are yielded as :class:`FieldUpload`
+    objects, and are spooled to temporary files once they are larger than
+    `spool_size`. A body without a ``CONTENT_LENGTH`` is empty, unless
+    the server sets ``wsgi.input_terminated``, and a body webob has already
+    buffered is read again from its start.
+
+    `max_memory`
+        Maximum number of bytes of non-file fields to hold in memory. Larger
+        submissions raise a :class:`ValidationError`. Defaults to the
+        middleware's ``max_form_memory``.
+    """
+    mw = core.request_local().get('middleware')
+    if encoding is None:
+        encoding = mw.config.encoding if mw else 'utf-8'
+    if max_memory is None:
+        max_memory = mw.config.max_form_memory if mw else MAX_MEMORY
+
+    content_type, options = _parse_options(environ.get('CONTENT_TYPE', ''))
+    length = environ.get('CONTENT_LENGTH')
+    if length:
+        try:
+            length = int(length)
+        except ValueError:
+            raise vd.ValidationError('corrupt')
+        if length < 0:
+            raise vd.ValidationError('corrupt')
+    elif environ.get('wsgi.input_terminated'):
+        # The server ends the input, as with a chunked body.
+        length = None
+    else:
+        # PEP 3333: a missing length means there is no body to read.
+        length = 0
+    stream = environ['wsgi.input']
+    if environ.get('webob.is_body_seekable'):
+        # webob has buffered the body, and may already have read it.
+        stream.seek(0)
+    reader = _BodyReader(stream, length, chunk_size)
+
+    if content_type == 'multipart/form-data':
+        boundary = options.get('boundary')
+        if not boundary:
+            raise vd.ValidationError('corrupt')
+        return _iter_multipart(reader, boundary.encode('latin-1'),
+                               encoding, max_memory, spool_size)
+    elif content_type in ('application/x-www-form-urlencoded', ''):
+        return _iter_urlencoded(reader, encoding, max_memory)
+    raise vd.ValidationError('corrupt')
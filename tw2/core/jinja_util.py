@@ -1,15 +1,31 @@
 from copy import copy
-from six.moves import filter
 
-_BOOLEAN_ATTRS = frozenset(['selected', 'checked', 'compact', 'declare',
-                            'defer', 'disabled', 'ismap', 'multiple',
-                            'nohref', 'noresize', 'noshade', 'nowrap'])
+from markupsafe import Markup
+
+from .native import BOOLEAN_ATTRS, widget_attrs as _widget_attrs
+
+_BOOLEAN_ATTRS = BOOLEAN_ATTRS
+
 
 def htmlbools(v):
+    keys = BOOLEAN_ATTRS.intersection(v)
+    if not keys:
+        return v
     attrs = copy(v)
-    for key in filter(lambda k: k in _BOOLEAN_ATTRS, attrs.keys()):
+    for key in keys:
         if attrs[key]:
             attrs[key] = key
         else:
             attrs[key] = None
     return attrs
+
+
+def widget_attrs(w):
+    """ The attributes of widget ``w``, rendered as by the other engines.
+
+    Unlike ``w.attrs | htmlbools | xmlattr``, this reuses the rendering of
+    the attributes ``w`` takes unchanged from its class::
+
+        <div {{ w | widget_attrs }}>
+    """
+    return Markup(_widget_attrs(w))
@@ -3,22 +3,21 @@ from mako.runtime import Undefined
 from copy import copy
 
 from markupsafe import Markup
-try:
-    from html import escape
-except ImportError:
-    from cgi import escape
-import six
+
+from .native import BOOLEAN_ATTRS, format_attrs, widget_attrs
 #from mako.filters import xml_escape
 
-__all__ = ["attrs"]
+__all__ = ["attrs", "display"]
 
-_BOOLEAN_ATTRS = frozenset(['selected', 'checked', 'compact', 'declare',
-                            'defer', 'disabled', 'ismap', 'multiple',
-                            'nohref', 'noresize', 'noshade', 'nowrap'])
+_BOOLEAN_ATTRS = BOOLEAN_ATTRS
 
 
 def attrs(context, args=None, attrs=None):
     # Emulates Genshi's AttrsDirective (poorly)
+    if not args and attrs is not None and context is not None:
+        w = context.get('w')
+        if w is not None and attrs is getattr(w, 'attrs', None):
+            return Markup(widget_attrs(w))
     if isinstance(args, list):
         args = dict(args)
     if not args:
@@ -27,12 +26,23 @@ def attrs(context, args=None, attrs=None):
         args = copy(args)
     if attrs:
         args.update(attrs)
-    bools = _BOOLEAN_ATTRS
+    return Markup(format_attrs(args))
+
+
+def display(context, widget, **kw):
+    """ Display `widget` straight to the template's output.
 
-    new_attrs = [six.u('%s="%s"') % (k, escape(six.text_type(k in bools and k or v), True))
-                 for k, v in six.iteritems(args)
-                 if (k not in bools and v is not None) or (k in bools and v)]
-    return Markup(six.u(" ").join(new_attrs))
+    ``${c.display()}`` renders a child widget to a string, which is then
+    copied to the template's output. This passes the child's output to the
+    template's output as it is produced instead::
+
+        <%namespace name="tw" module="tw2.core.mako_util"/>
+        % for c in w.children:
+            ${tw.display(c)}
+        % endfor
+    """
+    widget.display_to(context.write, **kw)
+    return ''
 
 
 def compat(context, attr):
@@ -0,0 +1,155 @@
+"""
+Instrumentation of validation.
+
+Once a sink is installed with :func:`set_sink`, every widget ``_validate``
+and every :meth:`tw2.core.Validator.to_python` call is timed and passed to
+the sink's ``record(kind, key, seconds, failed)`` method, where `kind` is
+``'widget'`` or ``'validator'``. Widgets are keyed by compound id, with
+repetition numbers replaced by ``#`` so that the rows of a repeating widget
+are counted together; validators are keyed by class name.
+
+While a sink is installed, forms are validated through their widgets rather
+than by a compiled validation plan, so that each widget is measured. With no
+sink installed, validation runs as usual and is not timed at all.
+
+Example::
+
+    from tw2.core import metrics
+    registry = metrics.Registry()
+    metrics.set_sink(registry)
+    twc.register_controller(registry, 'validation_metrics')
+"""
+from __future__ import absolute_import
+
+import json
+import logging
+import re
+import socket
+import threading
+from timeit import default_timer as timer
+
+import webob as wo
+
+log = logging.getLogger(__name__)
+
+#: The installed sink, or None.
+sink = None
+
+
+def set_sink(new_sink):
+    """
+    Send validation measurements to `new_sink`, or stop measuring if it is
+    None. Returns the sink that was installed before.
+    """
+    global sink
+    from . import validation
+    previous, sink = sink, new_sink
+    validation._time_validators(new_sink is not None)
+    return previous
+
+
+def widget_key(widget):
+    """ The key under which the validation of `widget` is recorded. """
+    cid = getattr(widget, 'compound_id', None)
+    if not cid:
+        return type(widget).__name__
+    return ':'.join('#' if s.isdigit() else s for s in cid.split(':'))
+
+
+class Registry(object):
+    """
+    A sink that keeps call counts, cumulative time and failure counts in
+    memory. It can be registered as a controller with
+    :func:`tw2.core.register_controller` to serve them as JSON.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, kind, key, seconds, failed):
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                entry = self._entries[kind, key] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            if failed:
+                entry[2] += 1
+
+    def stats(self, kind=None):
+        """
+        A list of dicts with the `kind`, `key`, `calls`, `time` (in seconds)
+        and `failures` of each widget and validator measured, the most time
+        consuming first. Only those of `kind` are listed, if it is given.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        out = [{'kind': k, 'key': key, 'calls': calls, 'time': seconds,
+                'failures': failures}
+               for (k, key), (calls, seconds, failures) in entries
+               if kind is None or k == kind]
+        out.sort(key=lambda e: -e['time'])
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def request(self, req):
+        kind = req.GET.get('kind')
+        return wo.Response(
+            body=json.dumps(self.stats(kind)).encode('utf-8'),
+            content_type='application/json',
+            charset='utf-8',
+        )
+
+
+class LoggingSink(object):
+    """ A sink that logs each measurement, at DEBUG level by default. """
+
+    def __init__(self, logger=log, level=logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def record(self, kind, key, seconds, failed):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%s %s %.3fms%s', kind, key,
+                            seconds * 1000, ' failed' if failed else '')
+
+
+_statsd_unsafe_re = re.compile(r'[^\w\-.]')
+
+
+class UDPSink(object):
+    """
+    A sink that sends each measurement as a statsd timer, and each failure
+    as a statsd counter, in a UDP datagram. Measurements are lost rather
+    than slowing down validation if the datagrams cannot be sent.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='tw2'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._names = {}
+
+    def _name(self, kind, key):
+        try:
+            return self._names[kind, key]
+        except KeyError:
+            name = '%s.%s.%s' % (self.prefix, kind, _statsd_unsafe_re.sub(
+                '_', key.replace(':', '.')))
+            if len(self._names) < 10000:
+                self._names[kind, key] = name
+            return name
+
+    def record(self, kind, key, seconds, failed):
+        name = self._name(kind, key)
+        data = '%s:%.3f|ms' % (name, seconds * 1000)
+        if failed:
+            data += '\n%s.failures:1|c' % name
+        try:
+            self.socket.sendto(data.encode('utf-8'), self.address)
+        except (socket.error, OSError):
+            pass
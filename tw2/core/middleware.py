@@ -7,6 +7,7 @@ from pkg_resources import iter_entry_points, DistributionNotFound
 from paste.deploy.converters import asbool, asint
 
 from . import core
+from . import profiler
 
 import logging
 import six
@@ -68,6 +69,24 @@ class Config(object):
     `encoding`
         The encoding to decode when performing validation (default: utf-8)
 
+    `max_form_memory`
+        The maximum number of bytes of form fields, not counting uploaded
+        files, that :func:`tw2.core.formparser.iter_form_fields` holds in
+        memory while parsing a request body. (default: 10MB)
+
+    `profile_render`
+        Whether to profile the rendering of every request with a
+        :class:`tw2.core.profiler.RenderProfiler`. (default: False)
+
+    `profile_header`
+        The name of a request header, such as ``X-TW2-Profile``, that turns
+        on profiling for the requests that carry it. (default: None)
+
+    `profile_callback`
+        A callable that is passed the request and the profiler at the end of
+        each profiled request. (default: log the profile in collapsed stack
+        format)
+
     `auto_reload_templates`
         Whether to automatically reload changed templates. Set this to False in
         production for efficiency. If this is None, it takes the same value as
@@ -82,6 +101,13 @@ class Config(object):
         preferred_rendering_engines, otherwise, it will try the default list if
         it does not find a template within your preferred list. (default: True)
 
+    `genshi_streams`
+        Whether child widgets rendered by Genshi and displayed inside their
+        parent's Genshi template (``displays_on='genshi'``) return their
+        unserialized stream, for the parent template to include, rather than
+        a string. The page is then serialized once, by the outermost template.
+        A widget displayed on its own always returns a string. (default: True)
+
     `rendering_engine_lookup`
         A dictionary of file extensions you expect to use for each type of
         template engine. Default::
@@ -114,9 +140,14 @@ class Config(object):
     debug = True
     validator_msgs = {}
     encoding = 'utf-8'
+    max_form_memory = 10 * 1024 * 1024
+    profile_render = False
+    profile_header = None
+    profile_callback = None
     auto_reload_templates = None
     preferred_rendering_engines = ['mako', 'genshi', 'jinja', 'kajiki']
     strict_engine_selection = True
+    genshi_streams = True
     rendering_extension_lookup = {
         'mako': ['mak', 'mako'],
         'genshi': ['genshi', 'html'],
@@ -138,13 +169,15 @@ class Config(object):
             'serve_controllers',
             'params_as_vars',
             'strict_engine_selection',
+            'genshi_streams',
             'debug',
+            'profile_render',
         )
         for prop in boolean_props:
             setattr(self, prop, asbool(getattr(self, prop)))
 
         # Set integer properties
-        for prop in ('res_max_age', 'bufsize'):
+        for prop in ('res_max_age', 'bufsize', 'max_form_memory'):
             setattr(self, prop, asint(getattr(self, prop)))
 
         if self.auto_reload_templates is None:
@@ -171,6 +204,9 @@ class TwMiddleware(object):
         self.config = Config(**config)
         self.resources = resources.ResourcesApp(self.config)
         self.controllers = controllers or ControllersApp()
+        #: The engine selected for each template, see
+        #: :func:`tw2.core.templating.get_engine_name`.
+        self.engine_name_cache = {}
 
         rl = core.request_local()
         # Load up controllers that wanted to be registered before we were ready
@@ -200,23 +236,39 @@ class TwMiddleware(object):
            path.startswith(self.config.res_prefix):
             return self.resources(environ, start_response)
         else:
-            if self.config.serve_controllers and \
-               path.startswith(self.config.controller_prefix):
-                resp = self.controllers(req)
+            if self.config.profile_render or (
+                    self.config.profile_header and
+                    self.config.profile_header in req.headers):
+                with profiler.profile() as prof:
+                    resp = self._respond(req)
+                callback = self.config.profile_callback or \
+                    profiler.log_profile
+                callback(req, prof)
             else:
-                if self.app:
-                    resp = req.get_response(self.app, catch_exc_info=True)
-                else:
-                    resp = wo.Response(status="404 Not Found")
+                resp = self._respond(req)
+        core.request_local().clear()
+        return resp(environ, start_response)
 
-            ct = resp.headers.get('Content-Type', 'text/plain').lower()
+    def _respond(self, req):
+        """ The response to a request that is not for a resource. """
+        if self.config.serve_controllers and \
+           req.path_info.startswith(self.config.controller_prefix):
+            resp = self.controllers(req)
+        else:
+            if self.app:
+                resp = req.get_response(self.app, catch_exc_info=True)
+            else:
+                resp = wo.Response(status="404 Not Found")
 
-            should_inject = (
-                self.config.inject_resources
-                and 'html' in ct
-                and not isinstance(resp.app_iter, types.GeneratorType)
-            )
-            if should_inject:
+        ct = resp.headers.get('Content-Type', 'text/plain').lower()
+
+        should_inject = (
+            self.config.inject_resources
+            and 'html' in ct
+            and not isinstance(resp.app_iter, types.GeneratorType)
+        )
+        if should_inject:
+            with profiler.span('inject', 'resources'):
                 if resp.charset:
                     body = self._resources_module.inject_resources(
                         resp.body.decode(resp.charset),
@@ -230,8 +282,7 @@ class TwMiddleware(object):
                     resp.unicode_body = body
                 else:
                     resp.body = body
-        core.request_local().clear()
-        return resp(environ, start_response)
+        return resp
 
 
 class ControllersApp(object):
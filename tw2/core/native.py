@@ -0,0 +1,162 @@
+"""
+Native renderings of the core templates.
+
+Each function here renders a widget exactly as the Mako flavor of one of
+the templates in :mod:`tw2.core.templates` does, byte for byte, but without
+going through :func:`tw2.core.templating.render` and a template engine.
+:meth:`tw2.core.Widget.generate_output` uses them in place of the template
+when Mako is the engine selected for it, which it is unless another engine
+comes before Mako in ``preferred_rendering_engines``.
+
+Each takes the widget and, optionally, a `write` function. Without it, the
+output is returned as Markup; with it, the output is passed to `write`, as
+:meth:`tw2.core.Widget.write_output` does.
+"""
+from __future__ import absolute_import
+
+from markupsafe import Markup, escape_silent
+import six
+
+try:
+    from html import escape
+except ImportError:
+    from cgi import escape
+
+#: Attributes rendered as ``name="name"`` when true, and left out when false.
+BOOLEAN_ATTRS = frozenset(['selected', 'checked', 'compact', 'declare',
+                           'defer', 'disabled', 'ismap', 'multiple',
+                           'nohref', 'noresize', 'noshade', 'nowrap'])
+
+
+def format_attrs(attrs):
+    """ Render a dict of html attributes, as ``tw.attrs`` does in Mako. """
+    return six.u(' ').join([f for f in (_format_attr(k, v)
+                                        for k, v in six.iteritems(attrs))
+                            if f])
+
+
+def _format_attr(k, v):
+    """ The rendering of attribute `k` with value `v`, or None if it is left
+    out. """
+    if k in BOOLEAN_ATTRS:
+        if not v:
+            return None
+        v = k
+    elif v is None:
+        return None
+    return six.u('%s="%s"') % (k, escape(six.text_type(v), True))
+
+
+# Values whose rendering can be kept while they are the same object.
+_IMMUTABLE = six.string_types + six.integer_types + (float, type(None))
+
+
+def widget_attrs(w):
+    """
+    :func:`format_attrs` of ``w.attrs``, reusing the rendering of the
+    attributes that ``w`` takes unchanged from its class.
+
+    The rendering of each attribute of a widget class with an immutable
+    value is kept on the class, in ``_attr_fragments``, the first time one
+    of its widgets is rendered; only attributes added or changed since, such
+    as those of :class:`tw2.core.Param` with ``attribute=True``, are
+    rendered again.
+    """
+    cls = type(w)
+    attrs = w.attrs
+    fragments = cls.__dict__.get('_attr_fragments')
+    if fragments is None:
+        fragments = dict(
+            (k, (v, _format_attr(k, v)))
+            for k, v in six.iteritems(cls.attrs) if isinstance(v, _IMMUTABLE))
+        cls._attr_fragments = fragments
+    out = []
+    for k, v in six.iteritems(attrs):
+        kept = fragments.get(k)
+        if kept is not None and kept[0] is v:
+            f = kept[1]
+        else:
+            f = _format_attr(k, v)
+        if f:
+            out.append(f)
+    return six.u(' ').join(out)
+
+
+def _text(value):
+    """ `value` as Mako's ``${value}`` renders it in the core templates. """
+    return six.text_type(escape_silent(value))
+
+
+def _output(text, write):
+    """ `text` as Markup, or passed to `write` if it is given. """
+    if write is None:
+        return Markup(text)
+    write(text)
+
+
+def display_children(w, write=None):
+    """ ``tw2.core.templates.display_children`` """
+    if write is not None:
+        # The children write straight to `write`, between our own pieces.
+        for _ in _write_children(w, write):
+            pass
+        return
+    out = [six.u('\n\n<div '), widget_attrs(w), six.u('>\n')]
+    separator = w.separator
+    for i, c in enumerate(w.children):
+        if i and separator:
+            out.append(six.u('          %s\n') % separator)
+        out.append(six.u('        %s\n') % c.display())
+    out.append(six.u('</div>\n'))
+    return Markup(six.u('').join(out))
+
+
+def iter_children(w):
+    """ The output of :func:`display_children`, in a piece for each child
+    as it is displayed. """
+    out = []
+    for _ in _write_children(w, out.append):
+        yield six.u('').join(out)
+        del out[:]
+    yield six.u('').join(out)
+
+
+def _write_children(w, write):
+    """ Write the output of :func:`display_children` to `write`, yielding
+    after each child. """
+    write(six.u('\n\n<div %s>\n') % widget_attrs(w))
+    separator = w.separator
+    for i, c in enumerate(w.children):
+        if i and separator:
+            write(six.u('          %s\n') % separator)
+        write(six.u('        '))
+        c.display_to(write)
+        write(six.u('\n'))
+        yield
+    write(six.u('</div>\n'))
+
+
+def jslink(w, write=None):
+    """ ``tw2.core.templates.jslink`` """
+    return _output(six.u('\n<script type="text/javascript" src="%s" %s>'
+                         '</script>') % (_text(w.link), widget_attrs(w)),
+                   write)
+
+
+def csslink(w, write=None):
+    """ ``tw2.core.templates.csslink`` """
+    return _output(six.u('<link rel="stylesheet" type="text/css" href="%s" '
+                         'media="%s" />') % (_text(w.link), _text(w.media)),
+                   write)
+
+
+def jssource(w, write=None):
+    """ ``tw2.core.templates.jssource`` """
+    return _output(six.u('<script type="text/javascript">%s</script>') %
+                   _text(w.src), write)
+
+
+def csssource(w, write=None):
+    """ ``tw2.core.templates.csssource`` """
+    return _output(six.u('<style type="text/css">%s</style>\n') %
+                   _text(w.src), write)
@@ -119,6 +119,13 @@ class Param(object):
             if locals()[arg] is not Default:
                 self.specified.append(arg)
 
+    def __copy__(self):
+        # copy.copy's generic path, through __reduce_ex__, is the bulk of
+        # the cost of overriding a param in a subclass.
+        prm = object.__new__(type(self))
+        prm.__dict__.update(self.__dict__)
+        return prm
+
     def __repr__(self):
         return '%s: %s (default: %s, defined on: %s)' % (
             self.name, self.description, self.default, self.defined_on)
@@ -160,13 +167,20 @@ class ParamMeta(type):
     def __new__(meta, name, bases, dct):
         """Create a new `Widget` subclass. This detects `Param` instances
         defined declaratively, updates with information from the containing
-        class, and stores the objects in `_params`."""
-
-        params = {}
-        for b in bases:
-            if hasattr(b, '_params'):
+        class, and stores the objects in `_params`. The names of the
+        attributes whose value is `Deferred` are stored in `_deferred`."""
+
+        # A class shares the param tables of its base, and only makes its
+        # own when it overrides some of its params.
+        inherited = [b for b in bases if hasattr(b, '_params')]
+        if len(inherited) == 1:
+            params = inherited[0]._all_params
+        else:
+            params = {}
+            for b in inherited:
                 params.update(b._all_params)
 
+        changed = {}
         for pname, prm in list(dct.items()):
             if isinstance(prm, Param):
                 if pname in params:
@@ -180,23 +194,58 @@ class ParamMeta(type):
                         prm.view_name = pname
                     prm.defined_on = name
 
-                params[pname] = prm
+                changed[pname] = prm
                 if not prm.child_param and prm.default is not Required:
                     dct[pname] = prm.default
                 else:
                     del dct[pname]
             elif pname in params:
-                params[pname] = copy.copy(params[pname])
-                params[pname].default = prm
+                changed[pname] = copy.copy(params[pname])
+                changed[pname].default = prm
                 if prm is Required and pname != 'validator':
                     del dct[pname]
 
+        # Inherit the deferred names of the bases, rather than looking
+        # through every member of the class.
+        deferred = set()
+        for b in bases:
+            deferred.update(_deferred_names(b))
+        for k, v in six.iteritems(dct):
+            if isinstance(v, Deferred):
+                deferred.add(k)
+            else:
+                deferred.discard(k)
+
         ins = type.__new__(meta, name, bases, dct)
+        ins._deferred = sorted(deferred)
+        if len(inherited) != 1:
+            params.update(changed)
+            own = dict((p.name, p) for p in params.values()
+                       if not p.child_param)
+        elif changed:
+            params = dict(params)
+            params.update(changed)
+            own = dict(inherited[0]._params)
+            for pname, prm in six.iteritems(changed):
+                if prm.child_param:
+                    own.pop(pname, None)
+                else:
+                    own[pname] = prm
+        else:
+            own = inherited[0]._params
         ins._all_params = params
-        ins._params = dict((p.name, p) for p in params.values()
-                                                    if not p.child_param)
+        ins._params = own
         return ins
 
 
+def _deferred_names(cls):
+    """ The names of the attributes of `cls` whose value is `Deferred`. """
+    if isinstance(cls, ParamMeta):
+        return cls._deferred
+    # A base that is not Parametered, such as a mixin.
+    return [k for c in cls.__mro__ for k, v in six.iteritems(vars(c))
+            if isinstance(v, Deferred)]
+
+
 class Parametered(six.with_metaclass(ParamMeta, object)):
     pass
@@ -0,0 +1,213 @@
+"""
+Profiling of widget rendering.
+
+A :class:`RenderProfiler` collects a tree of timings for the widgets
+displayed while it is active: each widget's display, keyed by compound id,
+and within it the widget's ``prepare``, its deferred parameters, its
+resources and its template, keyed by template name. Repetitions of a
+:class:`tw2.core.RepeatingWidget` are counted together, with ``#`` in place
+of their number. Resource injection by the middleware is measured too.
+
+Profile a block of code with::
+
+    with profiler.profile() as prof:
+        html = MyForm.display()
+    print(prof.to_json())
+
+or let the middleware profile requests, by setting its ``profile_render``
+or ``profile_header`` options.
+
+Each node records its number of calls, its time and the net number of
+memory blocks allocated during it, where the interpreter provides that
+figure (``sys.getallocatedblocks``). The tree can be exported as JSON, or as
+collapsed stacks for flame graph tools. While no profiler is active,
+each point that would be measured only checks a global counter.
+"""
+from __future__ import absolute_import
+
+import contextlib
+import json
+import logging
+import sys
+import threading
+from timeit import default_timer as timer
+
+import six
+
+from . import core
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+#: Number of profilers active in any thread.
+active = 0
+_active_lock = threading.Lock()
+
+_allocated_blocks = getattr(sys, 'getallocatedblocks', lambda: 0)
+
+
+class ProfileNode(object):
+    """ The timings of one kind of call at one place in the tree. """
+    __slots__ = ('kind', 'name', 'calls', 'time', 'allocations', 'children',
+                 '_index')
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.allocations = 0
+        self.children = []
+        self._index = {}
+
+    def child(self, kind, name):
+        try:
+            return self._index[kind, name]
+        except KeyError:
+            node = self._index[kind, name] = ProfileNode(kind, name)
+            self.children.append(node)
+            return node
+
+    @property
+    def self_time(self):
+        """ The time spent in this node but not in its children. """
+        return max(self.time - sum(c.time for c in self.children), 0.0)
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'calls': self.calls,
+            'time': self.time,
+            'self_time': self.self_time,
+            'allocations': self.allocations,
+            'children': [c.to_dict() for c in self.children],
+        }
+
+
+class _Span(object):
+    __slots__ = ('profiler', 'node', 'start', 'blocks')
+
+    def __init__(self, profiler, node):
+        self.profiler = profiler
+        self.node = node
+
+    def __enter__(self):
+        self.node.calls += 1
+        self.profiler._stack.append(self.node)
+        self.blocks = _allocated_blocks()
+        self.start = timer()
+
+    def __exit__(self, *exc_info):
+        self.node.time += timer() - self.start
+        self.node.allocations += _allocated_blocks() - self.blocks
+        self.profiler._stack.pop()
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_null_span = _NullSpan()
+
+
+class RenderProfiler(object):
+    """ A tree of render timings; see :mod:`tw2.core.profiler`. """
+
+    def __init__(self):
+        self.root = ProfileNode('request', '')
+        self._stack = [self.root]
+        self._start = None
+        self._blocks = None
+        self._previous = None
+
+    def span(self, kind, name):
+        """ A context manager that measures a `kind` of call named `name`. """
+        return _Span(self, self._stack[-1].child(kind, name))
+
+    def begin(self):
+        """ Make this the active profiler of the current thread. """
+        global active
+        rl = core.request_local()
+        self._previous = rl.get('render_profiler')
+        rl['render_profiler'] = self
+        with _active_lock:
+            active += 1
+        self.root.calls += 1
+        self._blocks = _allocated_blocks()
+        self._start = timer()
+
+    def end(self):
+        """ Stop profiling, restoring any profiler that was active before. """
+        global active
+        self.root.time += timer() - self._start
+        self.root.allocations += _allocated_blocks() - self._blocks
+        with _active_lock:
+            active -= 1
+        rl = core.request_local()
+        if self._previous is None:
+            rl.pop('render_profiler', None)
+        else:
+            rl['render_profiler'] = self._previous
+
+    def to_dict(self):
+        return self.root.to_dict()
+
+    def to_json(self, **kw):
+        return json.dumps(self.to_dict(), **kw)
+
+    def collapsed(self):
+        """
+        The tree in the collapsed stack format read by flame graph tools:
+        one line per node, of the frames from the root separated by ``;``
+        and the node's own time in microseconds.
+        """
+        lines = []
+
+        def walk(node, stack):
+            frame = ('%s %s' % (node.kind, node.name)).strip()
+            stack = stack + [frame.replace(';', ',')]
+            lines.append('%s %d' % (';'.join(stack),
+                                    round(node.self_time * 1e6)))
+            for c in node.children:
+                walk(c, stack)
+
+        walk(self.root, [])
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profile():
+    """ Profile rendering in the current thread within a ``with`` block. """
+    prof = RenderProfiler()
+    prof.begin()
+    try:
+        yield prof
+    finally:
+        prof.end()
+
+
+def span(kind, name):
+    """
+    A context manager that measures a `kind` of call with the active
+    profiler, if any. `name` may be a widget, to key it by compound id.
+    """
+    if not active:
+        return _null_span
+    prof = core.request_local().get('render_profiler')
+    if prof is None:
+        return _null_span
+    if not isinstance(name, six.string_types):
+        name = metrics.widget_key(name)
+    return prof.span(kind, name)
+
+
+def log_profile(req, prof):
+    """
+    The default ``profile_callback`` of the middleware: log the profile of
+    `req` in collapsed stack format.
+    """
+    log.info('Render profile of %s\n%s', req.path_info, prof.collapsed())
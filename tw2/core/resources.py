@@ -17,6 +17,7 @@ import tw2.core.core
 from .params import Param, Variable, ParameterError, Required
 from .middleware import register_resource
 from .js import encoder, js_symbol
+from . import native
 
 from markupsafe import Markup
 import six
@@ -235,6 +236,7 @@ class JSLink(Link):
     '''
     location = '__use_middleware'
     template = 'tw2.core.templates.jslink'
+    _native_template = (template, native.jslink)
 
 
 class CSSLink(Link):
@@ -246,6 +248,7 @@ class CSSLink(Link):
     media = Param('Media tag', default='all')
     location = 'head'
     template = 'tw2.core.templates.csslink'
+    _native_template = (template, native.csslink)
 
 
 class JSSource(Resource):
@@ -257,6 +260,7 @@ class JSSource(Resource):
     src = Param('Source code', default=None)
     location = 'bodybottom'
     template = 'tw2.core.templates.jssource'
+    _native_template = (template, native.jssource)
 
     def __eq__(self, other):
         return isinstance(other, JSSource) and self.src == other.src
@@ -280,6 +284,7 @@ class CSSSource(Resource):
     src = Param('CSS code', default=None)
     location = 'head'
     template = 'tw2.core.templates.csssource'
+    _native_template = (template, native.csssource)
 
     def __eq__(self, other):
         return isinstance(other, CSSSource) and self.src == other.src
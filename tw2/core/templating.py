@@ -1,5 +1,6 @@
 import os
 from . import core
+from . import profiler
 
 from .util import memoize, relpath
 
@@ -11,8 +12,14 @@ from six.moves import zip
 # Just shorthand
 SEP, ALTSEP, EXTSEP = os.path.sep, os.path.altsep, os.path.extsep
 
+#: The engine selected for each template name when there is no middleware.
+#: Each middleware has its own, as its ``engine_name_cache``.
 engine_name_cache = {}
 
+#: The directory of each module templates were looked up in, by its dotted
+#: name, with the names of the files in it.
+template_index = {}
+
 _default_rendering_extension_lookup = {
     'mako': ['mak', 'mako'],
     'genshi': ['genshi', 'html'],
@@ -33,58 +40,112 @@ def get_rendering_extensions_lookup(mw):
     return mw.config.rendering_extension_lookup
 
 
-@memoize
+def _engine_name_cache(mw):
+    if mw is None:
+        return engine_name_cache
+    return getattr(mw, 'engine_name_cache', engine_name_cache)
+
+
 def get_engine_name(template_name, mw=None):
-    if template_name in engine_name_cache:
-        return engine_name_cache[template_name]
+    """ The engine to render `template_name` with, selected by `mw`, or by
+    the middleware of the current request when None. """
+    if mw is None:
+        mw = core.request_local().get('middleware')
+    cache = _engine_name_cache(mw)
+    try:
+        return cache[template_name]
+    except KeyError:
+        pass
+    engine_name = _select_engine_name(template_name, mw)
+    cache[template_name] = engine_name
+    return engine_name
+
 
+def clear_engine_names(mw=None):
+    """ Forget the engines selected by `mw`, or without a middleware when
+    None, so that they are selected again; for instance after changing its
+    ``preferred_rendering_engines``. """
+    _engine_name_cache(mw).clear()
+
+
+def _select_engine_name(template_name, mw):
     if template_name and ':' in template_name:
-        engine_name = template_name.split(':', 1)[0]
-        engine_name_cache[template_name] = engine_name
-        return engine_name
+        return template_name.split(':', 1)[0]
 
     try:
-        if mw is None:
-            rl = core.request_local()
-            mw = rl['middleware']
         pref_rend_eng = mw.config.preferred_rendering_engines
-    except (KeyError, AttributeError):
+    except AttributeError:
         pref_rend_eng = ['mako', 'genshi', 'jinja', 'chameleon', 'kajiki']
 
     # find the first file in the preffered engines available for templating
     for engine_name in pref_rend_eng:
-        try:
-            get_source(engine_name, template_name, mw=mw)
-            engine_name_cache[template_name] = engine_name
+        if _has_flavor(engine_name, template_name, mw):
             return engine_name
-        except IOError:
-            pass
 
     if not mw.config.strict_engine_selection:
         pref_rend_eng = ['mako', 'genshi', 'jinja', 'chameleon', 'kajiki']
         for engine_name in pref_rend_eng:
-            try:
-                get_source(engine_name, template_name, mw=mw)
-                engine_name_cache[template_name] = engine_name
+            if _has_flavor(engine_name, template_name, mw):
                 return engine_name
-            except IOError:
-                pass
 
     raise ValueError("Could not find engine name for %s" % template_name)
 
 
-@memoize
-def _get_dotted_filename(engine_name, template, mw=None):
-    rendering_extension_lookup = get_rendering_extensions_lookup(mw)
-    template = _strip_engine_name(template, mw)
-    location, filename = template.rsplit('.', 1)
+def _has_flavor(engine_name, template_name, mw=None):
+    """ Whether there is a source of `template_name` for `engine_name`. """
+    try:
+        if SEP in template_name or (ALTSEP and ALTSEP in template_name):
+            get_source(engine_name, template_name, mw=mw)
+        else:
+            _get_dotted_filename(engine_name, template_name, mw=mw)
+    except IOError:
+        return False
+    return True
+
+
+def index_templates(*locations):
+    """ List the directories of the modules named by `locations`, such as
+    ``'tw2.core.templates'``, in :data:`template_index`.
+
+    Templates are found in the index rather than by looking for a file with
+    each extension of each engine. A directory is listed the first time a
+    template in it is looked up; calling this at startup lists them ahead of
+    the first request.
+    """
+    for location in locations:
+        _index(location)
+
+
+def _index(location):
+    try:
+        return template_index[location]
+    except KeyError:
+        pass
     module = __import__(location, globals(), locals(), ['*'])
     parent_dir = SEP.join(module.__file__.split(SEP)[:-1])
+    try:
+        names = frozenset(os.listdir(parent_dir))
+    except OSError:
+        names = frozenset()
+    template_index[location] = parent_dir, names
+    return parent_dir, names
+
+
+def _get_dotted_filename(engine_name, template, mw=None):
+    extensions = get_rendering_extensions_lookup(mw)[engine_name]
+    return _find_dotted_filename(_strip_engine_name(template, mw),
+                                 tuple(extensions))
+
 
-    for extension in rendering_extension_lookup[engine_name]:
-        abs_filename = parent_dir + SEP + filename + EXTSEP + extension
-        if os.path.exists(abs_filename):
-            return abs_filename
+@memoize
+def _find_dotted_filename(template, extensions):
+    location, filename = template.rsplit('.', 1)
+    parent_dir, names = _index(location)
+
+    for extension in extensions:
+        name = filename + EXTSEP + extension
+        if name in names:
+            return parent_dir + SEP + name
 
     raise IOError("Couldn't find source for %r" % template)
 
@@ -100,7 +161,6 @@ def _strip_engine_name(template, mw=None):
 
 
 
-@memoize
 def get_source(engine_name, template, inline=False, mw=None):
     if inline:
         return template
@@ -109,14 +169,29 @@ def get_source(engine_name, template, inline=False, mw=None):
         filename = _strip_engine_name(template, mw=mw)
     else:
         filename = _get_dotted_filename(engine_name, template, mw=mw)
+    return _read_source(filename)
 
+
+@memoize
+def _read_source(filename):
+    # Keyed by the file alone, so that no middleware is kept in the cache.
     with open(filename, 'rb') as f:
         return f.read().decode('utf-8')
 
 
+def _writes(render, write):
+    """ `render`, with `write` as its ``write`` attribute. """
+    render.write = write
+    return render
+
+
 @memoize
 def get_render_callable(engine_name, displays_on, src, filename=None, inline=False):
-    """ Returns a function that takes a template source and kwargs. """
+    """ Returns a function that takes a template source and kwargs.
+
+    Its ``write`` attribute is a function that takes kwargs and a `write`
+    function, and passes the output to `write` in pieces instead.
+    """
 
     # See the discussion here re: `displays_on` -- http://bit.ly/JRqbRw
 
@@ -128,6 +203,7 @@ def get_render_callable(engine_name, displays_on, src, filename=None, inline=Fal
         directory = os.path.dirname(filename)
 
     if engine_name == 'mako':
+        import mako.runtime
         import mako.template
         args = dict(text=src, imports=["from markupsafe import escape_silent"],
                     default_filters=['escape_silent'])
@@ -139,7 +215,15 @@ def get_render_callable(engine_name, displays_on, src, filename=None, inline=Fal
                 directories=[directory])
 
         tmpl = mako.template.Template(**args)
-        return lambda kwargs: Markup(tmpl.render_unicode(**kwargs))
+
+        def write(kwargs, write):
+            # Mako writes to the `write` of its context's buffer.
+            context = mako.runtime.Context(_Buffer(write), **kwargs)
+            context._outputting_as_unicode = True
+            tmpl.render_context(context, **kwargs)
+
+        return _writes(
+            lambda kwargs: Markup(tmpl.render_unicode(**kwargs)), write)
 
     elif engine_name in ('genshi', 'genshi_abs'):
         import genshi.template
@@ -153,37 +237,76 @@ def get_render_callable(engine_name, displays_on, src, filename=None, inline=Fal
             ])
 
         tmpl = genshi.template.MarkupTemplate(**args)
-        return lambda kwargs: Markup(
+
+        def write(kwargs, write):
+            for chunk in tmpl.generate(**kwargs).serialize('xhtml'):
+                write(chunk)
+
+        render = _writes(lambda kwargs: Markup(
             ''.join(tmpl.generate(**kwargs).serialize('xhtml'))
-        )
+        ), write)
+        # The unserialized stream, for a Genshi template to include.
+        render.stream = lambda kwargs: tmpl.generate(**kwargs)
+        return render
 
     elif engine_name == 'jinja':
         import jinja2
-        from .jinja_util import htmlbools
+        from .jinja_util import htmlbools, widget_attrs
         env = jinja2.environment.Environment(autoescape=True)
         env.filters['htmlbools'] = htmlbools
+        env.filters['widget_attrs'] = widget_attrs
         tmpl = env.from_string(src, template_class=jinja2.Template)
         tmpl.filename = filename
-        return lambda kwargs: Markup(tmpl.render(**kwargs))
+
+        def write(kwargs, write):
+            for chunk in tmpl.generate(**kwargs):
+                write(chunk)
+
+        return _writes(lambda kwargs: Markup(tmpl.render(**kwargs)), write)
 
     elif engine_name == 'kajiki':
         import kajiki
         tmpl = kajiki.XMLTemplate(src, filename=filename,
                                   cdata_scripts=False)
-        return lambda kwargs: Markup(tmpl(kwargs).render())
+
+        def write(kwargs, write):
+            for chunk in tmpl(kwargs):
+                write(chunk)
+
+        return _writes(lambda kwargs: Markup(tmpl(kwargs).render()), write)
 
     elif engine_name == 'chameleon':
         import chameleon
         tmpl = chameleon.PageTemplate(src, filename=filename)
-        return lambda kwargs: Markup(tmpl.render(**kwargs).strip())
+
+        def render(kwargs):
+            return Markup(tmpl.render(**kwargs).strip())
+
+        return _writes(render, lambda kwargs, write: write(render(kwargs)))
 
     raise NotImplementedError("Unhandled engine")
 
 
-def render(template_name, displays_on, kwargs, inline=False, mw=None):
+_GENSHI = ('genshi', 'genshi_abs')
+
+
+class _Buffer(object):
+    """ A buffer for Mako that passes what is written to it to `write`. """
+    __slots__ = ('write',)
+
+    def __init__(self, write):
+        self.write = write
+
+
+def render(template_name, displays_on, kwargs, inline=False, mw=None,
+           write=None, stream=False):
     """ Highest level function, here for convenience.
 
     Makes use of *all* other functions in this module.
+
+    If `write` is given, the output is passed to it in pieces, and nothing
+    is returned. If `stream` is true, a Genshi template displayed on Genshi
+    returns its unserialized stream, for a Genshi parent to include.
     """
 
     # Determine the engine name
@@ -193,15 +316,23 @@ def render(template_name, displays_on, kwargs, inline=False, mw=None):
         engine_name = inline
 
     if mw is not None and mw.config.auto_reload_templates:
-        get_source._flush()
+        _read_source._flush()
+        _find_dotted_filename._flush()
         get_render_callable._flush()
-
-    # Load the template source
-    source = get_source(engine_name, template_name, inline, mw)
-
-    # Establish the render function
-    callback = get_render_callable(
-        engine_name, displays_on, source, template_name, inline)
-
-    # Do it
-    return callback(kwargs)
+        template_index.clear()
+
+    name = template_name if not inline else '<inline %s>' % engine_name
+    with profiler.span('template', name):
+        # Load the template source
+        source = get_source(engine_name, template_name, inline, mw)
+
+        # Establish the render function
+        callback = get_render_callable(
+            engine_name, displays_on, source, template_name, inline)
+
+        # Do it
+        if write is not None:
+            return callback.write(kwargs, write)
+        if stream and displays_on in _GENSHI and engine_name in _GENSHI:
+            return callback.stream(kwargs)
+        return callback(kwargs)
@@ -3,6 +3,7 @@
 import copy
 import re
 import functools
+import six
 import six.moves
 
 try:
@@ -12,6 +13,12 @@ except ImportError:
     # py3
     import _thread as thread
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    # py2
+    from collections import MutableMapping
+
 import webob
 
 _thread_local = {}
@@ -129,9 +136,128 @@ def flush_memoization():
         cb()
 
 
+class CopyOnWriteDict(MutableMapping):
+    """
+    A mapping of `data`, with the keys of `extra`, if given, added or
+    replaced, in that order. It reads from both until it is first changed,
+    and then from a copy of them, so that neither is ever changed.
+    """
+    __slots__ = ('_data', '_extra', '_shared')
+
+    def __init__(self, data, extra=None):
+        self._data = data
+        self._extra = extra or None
+        self._shared = True
+
+    def _own(self):
+        if self._shared:
+            self._data = self.copy()
+            self._extra = None
+            self._shared = False
+        return self._data
+
+    def __getitem__(self, key):
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._own()[key] = value
+
+    def __delitem__(self, key):
+        del self._own()[key]
+
+    def __iter__(self):
+        if self._extra is None:
+            return iter(self._data)
+        return self._iter_merged()
+
+    def _iter_merged(self):
+        data = self._data
+        for key in data:
+            yield key
+        for key in self._extra:
+            if key not in data:
+                yield key
+
+    def __len__(self):
+        if self._extra is None:
+            return len(self._data)
+        data = self._data
+        return len(data) + sum(1 for key in self._extra if key not in data)
+
+    def __contains__(self, key):
+        extra = self._extra
+        return key in self._data or (extra is not None and key in extra)
+
+    def __eq__(self, other):
+        if isinstance(other, CopyOnWriteDict):
+            other = other.copy()
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def get(self, key, default=None):
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        return self._data.get(key, default)
+
+    def keys(self):
+        if self._extra is None:
+            return self._data.keys()
+        return MutableMapping.keys(self)
+
+    def values(self):
+        if self._extra is None:
+            return self._data.values()
+        return MutableMapping.values(self)
+
+    def items(self):
+        if self._extra is None:
+            return self._data.items()
+        return MutableMapping.items(self)
+
+    if six.PY2:
+        def iterkeys(self):
+            return iter(self)
+
+        def itervalues(self):
+            if self._extra is None:
+                return self._data.itervalues()
+            return MutableMapping.itervalues(self)
+
+        def iteritems(self):
+            if self._extra is None:
+                return self._data.iteritems()
+            return MutableMapping.iteritems(self)
+
+    def copy(self):
+        data = dict(self._data)
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
+
+    __copy__ = copy
+
+    def __json__(self):
+        return self.copy()
+
+
+class _TemporaryObject(object):
+    pass
+
+
 def clone_object(obj, **values):
     if obj is None:
-        obj = type('_TemporaryObject', (object,), {})()
+        obj = _TemporaryObject()
     else:
         obj = copy.copy(obj)
 
@@ -1,6 +1,7 @@
 from . import core
 import re
 from . import util
+from . import metrics
 import string
 import datetime
 import copy
@@ -31,6 +32,12 @@ try:
 except ImportError:
     formencode = None
 
+try:
+    import ipaddress
+except ImportError:
+    # py2 without the backport
+    ipaddress = None
+
 
 class Invalid(object):
     pass
@@ -51,6 +58,7 @@ else:
             self.msg = msg
 
 
+@six.python_2_unicode_compatible
 class ValidationError(BaseValidationError):
     """Invalid data was encountered during validation.
 
@@ -59,10 +67,30 @@ class ValidationError(BaseValidationError):
     ``$val``` are substituted with that attribute from the validator. An
     explicit validator instance can be passed to the constructor, or this
     defaults to :class:`Validator` otherwise.
+
+    The message is only looked up and formatted when it is first used, as
+    many errors raised during validation are never displayed.
     """
     def __init__(self, msg, validator=None, widget=None):
+        super(ValidationError, self).__init__(msg)
         self.widget = widget
-        validator = validator or Validator
+        self._key = msg
+        self._validator = validator or Validator
+        self._msg = None
+
+    @property
+    def msg(self):
+        if self._msg is None:
+            self._msg = self._format()
+        return self._msg
+
+    @msg.setter
+    def msg(self, value):
+        self._msg = value
+
+    def _format(self):
+        msg = self._key
+        validator = self._validator
         mw = core.request_local().get('middleware')
         if isinstance(validator, Validator):
             msg = validator.msg_rewrites.get(msg, msg)
@@ -77,9 +105,34 @@ class ValidationError(BaseValidationError):
         if msg == 'childerror':
             msg = ''
 
-        msg = re.sub('\$(\w+)',
-                lambda m: str(getattr(validator, m.group(1))), six.text_type(msg))
-        super(ValidationError, self).__init__(msg)
+        parts = _msg_template(six.text_type(msg))
+        if len(parts) == 1:
+            return parts[0]
+        return u''.join(
+            str(getattr(validator, p)) if i % 2 else p
+            for i, p in enumerate(parts)
+        )
+
+    def __str__(self):
+        return self.msg
+
+    def __repr__(self):
+        args = self.args
+        if len(args) == 1:
+            return '%s(%r)' % (type(self).__name__, args[0])
+        return type(self).__name__ + repr(args)
+
+    # The formatted message comes first, as when it was formatted up front,
+    # rather than the message name the exception was created with.
+    @property
+    def args(self):
+        return (self.msg,) + BaseException.args.__get__(self)[1:]
+
+    @args.setter
+    def args(self, value):
+        BaseException.args.__set__(self, value)
+        if value:
+            self.msg = value[0]
 
     @property
     def message(self):
@@ -87,6 +140,25 @@ class ValidationError(BaseValidationError):
         return self.msg
 
 
+_msg_var_re = re.compile(r'\$(\w+)')
+_msg_templates = {}
+
+
+def _msg_template(text):
+    """
+    Split a message into literal text, at even indexes, and the names of the
+    validator attributes to substitute, at odd indexes.
+    """
+    try:
+        return _msg_templates[text]
+    except KeyError:
+        parts = _msg_var_re.split(text)
+        # Messages can include submitted values, so only so many are kept.
+        if len(_msg_templates) < 1024:
+            _msg_templates[text] = parts
+        return parts
+
+
 catch = ValidationError
 if formencode:
     catch = (catch, formencode.Invalid)
@@ -102,22 +174,46 @@ def safe_validate(validator, value, state=None):
 def catch_errors(fn):
     @functools.wraps(fn)
     def wrapper(self, *args, **kw):
+        sink = metrics.sink
+        if sink is not None:
+            start = metrics.timer()
         try:
             d = fn(self, *args, **kw)
-            return d
         except catch as e:
-            e_msg = six.text_type(e)
+            error = wrap_error(e, self)
             if self:
-                self.error_msg = e_msg
-            raise ValidationError(e_msg, widget=self)
+                self.error_msg = error.msg
+            if sink is not None:
+                sink.record('widget', metrics.widget_key(self),
+                            metrics.timer() - start, True)
+            raise error
+        if sink is not None:
+            sink.record('widget', metrics.widget_key(self),
+                        metrics.timer() - start, False)
+        return d
     return wrapper
 
 
+def wrap_error(e, widget):
+    """
+    The :class:`ValidationError` that :func:`catch_errors` raises on catching
+    `e` from `widget`. A ValidationError's message, once formatted, is passed
+    on as it is rather than being looked up again.
+    """
+    if isinstance(e, ValidationError):
+        error = ValidationError(e._key, e._validator, widget)
+        error.msg = e.msg
+        return error
+    return ValidationError(six.text_type(e), widget=widget)
+
+
 def unflatten_params(params):
     """This performs the first stage of validation. It takes a dictionary where
     some keys will be compound names, such as "form:subform:field" and converts
     this into a nested dict/list structure. It also performs unicode decoding,
     with the encoding specified in the middleware config.
+
+    The passed `params` are not modified.
     """
     if isinstance(params, webob.MultiDict):
         params = params.mixed()
@@ -125,24 +221,74 @@ def unflatten_params(params):
     mw = core.request_local().get('middleware')
     enc = mw.config.encoding if mw else 'utf-8'
 
+    out = {}
+    # Every dict created below the top level, in creation order, along with
+    # the dict and key it is stored under.
+    nested = []
+    # Dicts by compound name, so fields sharing a prefix only walk it once.
+    containers = {}
+
+    def container(prefix):
+        parent_prefix, sep, e = prefix.rpartition(':')
+        if not sep:
+            parent = out
+        else:
+            try:
+                parent = containers[parent_prefix]
+            except KeyError:
+                parent = container(parent_prefix)
+        try:
+            dct = parent[e]
+        except KeyError:
+            dct = parent[e] = {}
+            nested.append((parent, e, dct))
+        containers[prefix] = dct
+        return dct
+
     try:
-        for p in params:
-            if isinstance(params[p], six.binary_type):
-                params[p] = params[p].decode(enc)
+        for pname, value in six.iteritems(params):
+            if isinstance(value, six.binary_type):
+                value = value.decode(enc)
+            prefix, sep, pname = pname.rpartition(':')
+            if not sep:
+                dct = out
+            else:
+                try:
+                    dct = containers[prefix]
+                except KeyError:
+                    dct = container(prefix)
+            dct[pname] = value
+            if isinstance(value, dict):
+                _copy_nested(dct, pname, value, nested)
     except UnicodeDecodeError:
         raise ValidationError('decode', Validator(encoding=enc))
 
-    out = {}
-    for pname in params:
-        dct = out
-        elements = pname.split(':')
-        for e in elements[:-1]:
-            dct = dct.setdefault(e, {})
-        dct[elements[-1]] = params[pname]
-
-    numdict_to_list(out)
+    # Children were created after their parents, so walking backwards turns
+    # the innermost numeric dicts into lists first.
+    is_index = {}
+    for parent, key, dct in reversed(nested):
+        if parent.get(key) is not dct:
+            continue
+        for k in dct:
+            try:
+                numeric = is_index[k]
+            except KeyError:
+                numeric = is_index[k] = bool(number_re.match(k))
+            if not numeric:
+                break
+        else:
+            parent[key] = [dct[x] for x in sorted(dct, key=int)]
     return out
 
+def _copy_nested(parent, key, dct, nested):
+    """ Replace `dct`, and any dicts inside it, with copies that can be
+    modified, recording each one in `nested`. """
+    dct = parent[key] = dict(dct)
+    nested.append((parent, key, dct))
+    for k, v in list(dct.items()):
+        if isinstance(v, dict):
+            _copy_nested(dct, k, v, nested)
+
 number_re = re.compile('^\d+$')
 
 
@@ -154,10 +300,15 @@ def numdict_to_list(dct):
                 dct[k] = [v[x] for x in sorted(v, key=int)]
 
 
+# The hooks as Validator defines them; filled in once it exists.
+_base_hooks = {}
+
+
 class ValidatorMeta(type):
     """Metaclass for :class:`Validator`.
 
-    This makes the :attr:`msgs` dict copy from its base class.
+    This makes the :attr:`msgs` dict copy from its base class, and gives the
+    class a :meth:`to_python` specialized to the hooks it overrides.
     """
     def __new__(meta, name, bases, dct):
         if 'msgs' in dct:
@@ -187,7 +338,24 @@ class ValidatorMeta(type):
             warnings.warn('validate_python() is deprecated;'
                 ' use _validate_python() instead',
                 DeprecationWarning, stacklevel=2)
-        return type.__new__(meta, name, bases, dct)
+        cls = type.__new__(meta, name, bases, dct)
+        if _base_hooks and issubclass(cls, Validator):
+            _specialize_to_python(cls)
+            if metrics.sink is not None:
+                _time_to_python(cls)
+        return cls
+
+    # A hook set on, or deleted from, a class after it is created, as when
+    # it is patched in a test, specializes it and its subclasses again.
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        if name in _base_hooks and not _is_specialized(value):
+            _respecialize(cls)
+
+    def __delattr__(cls, name):
+        type.__delattr__(cls, name)
+        if name in _base_hooks:
+            _respecialize(cls)
 
 
 class Validator(six.with_metaclass(ValidatorMeta, object)):
@@ -214,6 +382,7 @@ class Validator(six.with_metaclass(ValidatorMeta, object)):
         'required': _('Enter a value'),
         'decode': _('Received in wrong character set; should be $encoding'),
         'corrupt': _('Form submission received corrupted; please try again'),
+        'toolarge': _('Form submission is too large'),
         'childerror': '',  # Children of this widget have errors
     }
     required = False
@@ -268,6 +437,32 @@ class Validator(six.with_metaclass(ValidatorMeta, object)):
         return value is None or value == '' or (
             isinstance(value, (list, tuple, dict)) and not value)
 
+    def validate_many(self, values, state=None):
+        """
+        Convert and validate each of `values`, such as a column of imported
+        data. Return a list of the results, with :class:`Invalid` in place of
+        any value that failed.
+        """
+        out = self._validate_many_stateless(values)
+        if out is not None:
+            return out
+        to_python = self.to_python
+        out = []
+        for value in values:
+            try:
+                out.append(to_python(value, state))
+            except catch:
+                out.append(Invalid)
+        return out
+
+    def _validate_many_stateless(self, values):
+        """
+        :meth:`validate_many` of `values`, for a validator that validates
+        them without looking at a state, in a tight loop; or None for one
+        that must validate them one at a time, as this one does.
+        """
+        return None
+
     def validate_python(self, value, state=None):
         """"Deprecated, use :meth:`_validate_python` instead.
 
@@ -287,6 +482,187 @@ class Validator(six.with_metaclass(ValidatorMeta, object)):
             setattr(nself, k, kw[k])
         return nself
 
+_base_hooks.update(
+    (name, six.get_unbound_function(getattr(Validator, name)))
+    for name in ('to_python', '_is_empty', '_convert_to_python',
+                 '_validate_python')
+)
+_empty_types = (list, tuple, dict)
+_regex_cache = {}
+
+
+def compile_regex(pattern, flags=0):
+    """
+    Compile a regular expression, or return the one compiled earlier in this
+    process for the same pattern and flags.
+    """
+    try:
+        return _regex_cache[pattern, flags]
+    except KeyError:
+        regex = _regex_cache[pattern, flags] = re.compile(pattern, flags)
+        return regex
+
+
+def _validate_many_by(validator, values, check, validate_python):
+    """
+    :meth:`Validator.validate_many` for a validator whose only hook is
+    `validate_python`, which passes values for which `check` is true. Returns
+    None if `validator` has other hooks, and must validate one at a time.
+    """
+    cls = type(validator)
+    if not getattr(six.get_unbound_function(cls.to_python),
+                   '_specialized', False) or \
+       six.get_unbound_function(cls._validate_python) is not validate_python:
+        return None
+    for name in ('_is_empty', '_convert_to_python'):
+        if six.get_unbound_function(getattr(cls, name)) is not \
+           _base_hooks[name]:
+            return None
+    d = validator.__dict__
+    if '_is_empty' in d or '_convert_to_python' in d or \
+       '_validate_python' in d:
+        return None
+
+    strip = validator.strip
+    empty = Invalid if validator.required else validator.if_empty
+    string_types = six.string_types
+    out = []
+    for value in values:
+        if value is None or value == '' or (
+                isinstance(value, _empty_types) and not value):
+            out.append(empty)
+            continue
+        if strip and isinstance(value, string_types):
+            value = value.strip()
+        out.append(value if check(value) else Invalid)
+    return out
+
+
+def _is_specialized(fn):
+    """ Whether `fn` is a ``to_python`` made by :func:`_specialize_to_python`,
+    timed or not. """
+    fn = getattr(fn, '_untimed', fn)
+    return getattr(fn, '_specialized', False)
+
+
+def _specialize_to_python(cls):
+    """
+    Give `cls` a :meth:`Validator.to_python` that skips the hooks it does not
+    override, unless it, or a base, defines its own ``to_python``.
+
+    The hooks are those of `cls`; a subclass calling it through ``super``,
+    or an instance with hooks of its own, gets the generic ``to_python``.
+    """
+    current = None
+    for base in cls.__mro__:
+        fn = base.__dict__.get('to_python')
+        if fn is not None and not _is_specialized(fn):
+            current = getattr(fn, '_untimed', fn)
+            break
+    if current is not _base_hooks['to_python']:
+        if _is_specialized(cls.__dict__.get('to_python')):
+            type.__delattr__(cls, 'to_python')
+        return
+
+    def hook(name):
+        fn = six.get_unbound_function(getattr(cls, name))
+        return None if fn is _base_hooks[name] else fn
+
+    custom_empty = hook('_is_empty')
+    convert = hook('_convert_to_python')
+    validate = hook('_validate_python')
+    string_types = six.string_types
+    generic = _base_hooks['to_python']
+
+    def to_python(self, value, state=None):
+        d = self.__dict__
+        if type(self) is not cls or '_convert_to_python' in d or \
+           '_validate_python' in d or '_is_empty' in d:
+            return generic(self, value, state)
+        if custom_empty is not None:
+            empty = self._is_empty(value)
+        else:
+            empty = value is None or value == '' or (
+                isinstance(value, _empty_types) and not value)
+        if empty:
+            if self.required:
+                raise ValidationError('required', self)
+            return self.if_empty
+        if self.strip and isinstance(value, string_types):
+            value = value.strip()
+        if convert is not None:
+            value = convert(self, value, state)
+        if validate is not None:
+            validate(self, value, state)
+        return value
+
+    to_python.__doc__ = _base_hooks['to_python'].__doc__
+    to_python._specialized = True
+    cls.to_python = to_python
+
+
+def _respecialize(cls):
+    """ :func:`_specialize_to_python` for `cls` and its subclasses. """
+    if not _base_hooks:
+        return
+    pending = [cls]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        _specialize_to_python(cls)
+        if metrics.sink is not None:
+            _time_to_python(cls)
+
+
+def _time_to_python(cls):
+    """
+    Wrap the ``to_python`` that `cls` defines, if any, to report each call
+    to the installed :mod:`tw2.core.metrics` sink.
+    """
+    fn = cls.__dict__.get('to_python')
+    if fn is None or hasattr(fn, '_untimed'):
+        return
+
+    @functools.wraps(fn)
+    def to_python(self, value, state=None):
+        sink = metrics.sink
+        if sink is None:
+            return fn(self, value, state)
+        start = metrics.timer()
+        try:
+            value = fn(self, value, state)
+        except catch:
+            sink.record('validator', type(self).__name__,
+                        metrics.timer() - start, True)
+            raise
+        sink.record('validator', type(self).__name__,
+                    metrics.timer() - start, False)
+        return value
+
+    # Not marked as specialized, so validate_many goes through it.
+    to_python.__dict__.pop('_specialized', None)
+    to_python._untimed = fn
+    type.__setattr__(cls, 'to_python', to_python)
+
+
+def _time_validators(on):
+    """
+    Start or stop timing the ``to_python`` of every validator class. Only
+    called by :func:`tw2.core.metrics.set_sink`, so validators cost nothing
+    extra while no sink is installed.
+    """
+    pending = [Validator]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if on:
+            _time_to_python(cls)
+        else:
+            fn = cls.__dict__.get('to_python')
+            if hasattr(fn, '_untimed'):
+                type.__setattr__(cls, 'to_python', fn._untimed)
+
+
 if formencode:
     validator_classes = (Validator, formencode.Validator)
 else:
@@ -437,6 +813,80 @@ class OneOfValidator(Validator):
             raise ValidationError('notinlist', self)
 
 
+# strptime's patterns for the numeric directives, and the datetime argument
+# each one gives.
+_datetime_directives = {
+    'Y': (r'(\d\d\d\d)', 0),
+    'm': (r'(1[0-2]|0[1-9]|[1-9])', 1),
+    'd': (r'(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])', 2),
+    'H': (r'(2[0-3]|[0-1]\d|\d)', 3),
+    'M': (r'([0-5]\d|\d)', 4),
+    'S': (r'(6[0-1]|[0-5]\d|\d)', 5),
+    'f': (r'([0-9]{1,6})', 6),
+}
+_datetime_formats = {}
+
+
+def _compile_datetime_format(format):
+    """
+    Compile a strptime format that only has numeric directives into a regular
+    expression and the datetime argument of each group, or return None if it
+    has other directives.
+    """
+    pattern = []
+    args = []
+    pos = 0
+    while pos < len(format):
+        c = format[pos]
+        if c == '%':
+            d = format[pos + 1:pos + 2]
+            if d == '%':
+                pattern.append('%')
+            elif d in _datetime_directives and \
+                    _datetime_directives[d][1] not in args:
+                pattern.append(_datetime_directives[d][0])
+                args.append(_datetime_directives[d][1])
+            else:
+                return None
+            pos += 2
+        elif c.isspace():
+            while pos < len(format) and format[pos].isspace():
+                pos += 1
+            pattern.append(r'\s+')
+        else:
+            pattern.append(re.escape(c))
+            pos += 1
+    return re.compile(''.join(pattern) + r'\Z', re.IGNORECASE), args
+
+
+def parse_datetime(value, format):
+    """
+    Parse `value` like :meth:`datetime.datetime.strptime` does. Formats made
+    only of ``%Y %m %d %H %M %S %f`` fields, such as ``%Y-%m-%d``,
+    ``%d/%m/%Y`` and ``%Y-%m-%dT%H:%M:%S``, are parsed by a regular
+    expression compiled once per format; others by strptime.
+    """
+    try:
+        compiled = _datetime_formats[format]
+    except KeyError:
+        compiled = _datetime_formats[format] = \
+            _compile_datetime_format(format)
+    if compiled is None or not isinstance(value, six.string_types):
+        return datetime.datetime.strptime(value, format)
+
+    regex, args = compiled
+    m = regex.match(value)
+    if m is None:
+        raise ValueError("time data %r does not match format %r" %
+                         (value, format))
+    fields = [1900, 1, 1, 0, 0, 0, 0]
+    for arg, group in zip(args, m.groups()):
+        if arg == 6:
+            group = group.ljust(6, '0')
+        fields[arg] = int(group)
+    return datetime.datetime(*fields)
+
+
 class DateTimeValidator(RangeValidator):
     """
     Confirm the value is a valid date and time. This is derived from
@@ -477,15 +927,32 @@ class DateTimeValidator(RangeValidator):
     def max_str(self):
         return self.max.strftime(self.format)
 
+    # Number of parsed strings each validator remembers
+    _memo_size = 256
+
     def _convert_to_python(self, value, state=None):
         if isinstance(value, datetime.datetime):
             return value
         if isinstance(value, datetime.date):
             return datetime.datetime(value.year, value.month, value.day)
+        # Made on first use, so that subclasses need not call __init__.
+        # Keyed by format too, as clones share it.
+        memo = self.__dict__.get('_memo')
+        if memo is None:
+            memo = self._memo = {}
+        key = (self.format, value)
+        try:
+            return memo[key]
+        except (KeyError, TypeError):
+            pass
         try:
-            return datetime.datetime.strptime(value, self.format)
+            parsed = parse_datetime(value, self.format)
         except ValueError:
             raise ValidationError('baddatetime', self)
+        if len(memo) >= self._memo_size:
+            memo.clear()
+        memo[key] = parsed
+        return parsed
 
     def _validate_python(self, value, state=None):
         super(DateTimeValidator, self)._validate_python(value, state)
@@ -524,10 +991,19 @@ class RegexValidator(Validator):
     }
     regex = None
 
+    def __init__(self, **kw):
+        super(RegexValidator, self).__init__(**kw)
+        if isinstance(self.regex, six.string_types):
+            self.regex = compile_regex(self.regex)
+
     def _validate_python(self, value, state=None):
         if not self.regex.search(value):
             raise ValidationError('badregex', self)
 
+    def _validate_many_stateless(self, values):
+        return _validate_many_by(self, values, self.regex.search,
+                                 _validate_regex)
+
 
 class EmailValidator(RegexValidator):
     """
@@ -536,7 +1012,7 @@ class EmailValidator(RegexValidator):
     msgs = {
         'badregex': ('bademail', _('Must be a valid email address')),
     }
-    regex = re.compile('^[\w\-.]+@[\w\-.]+$')
+    regex = compile_regex('^[\w\-.]+@[\w\-.]+$')
 
 
 class UrlValidator(RegexValidator):
@@ -546,39 +1022,85 @@ class UrlValidator(RegexValidator):
     msgs = {
         'regex': ('badurl', _('Must be a valid URL')),
     }
-    regex = re.compile('^https?://', re.IGNORECASE)
+    regex = compile_regex('^https?://', re.IGNORECASE)
 
 
 class IpAddressValidator(Validator):
     """
-    Confirm the value is a valid IP4 address, or network block.
+    Confirm the value is a valid IP address, or network block.
 
     `allow_netblock`
         Allow the IP address to include a network block (default: False)
 
     `require_netblock`
         Require the IP address to include a network block (default: False)
+
+    `allow_ipv6`
+        Accept IPv6 addresses and network blocks as well as IPv4 ones. This
+        needs the :mod:`ipaddress` module. (default: False)
+
+    IPv6 addresses are checked by :mod:`ipaddress`. IPv4 ones are checked by
+    a regular expression instead, which, unlike :mod:`ipaddress`, accepts
+    octets with leading zeros, such as ``010.0.0.1``, as this validator
+    always has.
     """
     allow_netblock = False
     require_netblock = False
+    allow_ipv6 = False
 
     msgs = {
         'badipaddress': _('Must be a valid IP address'),
         'badnetblock': _('Must be a valid IP network block'),
     }
-    regex = re.compile('^(\d+)\.(\d+)\.(\d+)\.(\d+)(/(\d+))?$')
+    # An IPv4 address, with octets checked here rather than in Python
+    _ipv4 = r'(?:0*(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}' \
+            r'0*(?:25[0-5]|2[0-4]\d|1?\d?\d)'
+    regex = compile_regex('^' + _ipv4 + r'(?:/(\d+))?$')
+    address_regex = compile_regex('^' + _ipv4 + '$')
+
+    def _error(self, value):
+        """ The name of the message for what is wrong with `value`, or None
+        if it is valid. """
+        m = self.regex.match(value)
+        if m:
+            prefix, max_prefix = m.group(1), 32
+        elif self.allow_ipv6 and ipaddress and ':' in value:
+            address, sep, prefix = value.partition('/')
+            try:
+                ipaddress.IPv6Address(six.text_type(address))
+            except ValueError:
+                return 'badipaddress'
+            if sep and not prefix.isdigit():
+                return 'badipaddress'
+            prefix, max_prefix = prefix or None, 128
+        else:
+            return 'badipaddress'
 
-    def _validate_python(self, value, state=None):
-        m = self.regex.search(value)
-        if not m or any(not(0 <= int(g) <= 255) for g in m.groups()[:4]):
-            raise ValidationError('badipaddress', self)
-        if m.group(6):
+        if prefix is not None:
             if not self.allow_netblock:
-                raise ValidationError('badipaddress', self)
-            if not (0 <= int(m.group(6)) <= 32):
-                raise ValidationError('badnetblock', self)
+                return 'badipaddress'
+            if int(prefix) > max_prefix:
+                return 'badnetblock'
         elif self.require_netblock:
-            raise ValidationError('badnetblock', self)
+            return 'badnetblock'
+        return None
+
+    def _validate_python(self, value, state=None):
+        error = self._error(value)
+        if error:
+            raise ValidationError(error, self)
+
+    def _validate_many_stateless(self, values):
+        if self.allow_netblock or self.require_netblock or self.allow_ipv6:
+            error = self._error
+            check = lambda v: not error(v)
+        else:
+            check = self.address_regex.match
+        return _validate_many_by(self, values, check, _validate_ip)
+
+
+_validate_regex = six.get_unbound_function(RegexValidator._validate_python)
+_validate_ip = six.get_unbound_function(IpAddressValidator._validate_python)
 
 
 class UUIDValidator(Validator):
@@ -668,9 +1190,16 @@ class CompoundValidator(Validator):
         self.validators = []
         for arg in args:
             if isinstance(arg, validator_classes):
-                self.validators.append(arg)
+                validator = arg
             elif issubclass(arg, validator_classes):
-                self.validators.append(arg())
+                validator = arg()
+            else:
+                validator = None
+            # All(All(a, b), c) is All(a, b, c), and likewise for Any
+            if type(validator) is type(self):
+                self.validators.extend(validator.validators)
+            elif validator is not None:
+                self.validators.append(validator)
             if getattr(arg, 'required', False):
                 self.required = True
 
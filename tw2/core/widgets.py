@@ -1,16 +1,19 @@
 from __future__ import absolute_import
 
+import collections
 import copy
 import weakref
 import re
 import itertools
-import inspect
 import webob
 import uuid
 
 from . import templating
+from . import native
 from . import core
 from . import util
+from . import metrics
+from . import profiler
 from . import validation as vd
 from . import params as pm
 import six
@@ -33,6 +36,12 @@ reserved_names = (
 )
 _widget_seq = itertools.count(0)
 _omitted = object()
+# Kinds of node in a validation plan; see Widget._gen_validation_plan
+_PLAN_LEAF, _PLAN_COMPOUND, _PLAN_REPEAT = range(3)
+
+
+def _func(method):
+    return six.get_unbound_function(method)
 
 
 class WidgetMeta(pm.ParamMeta):
@@ -137,6 +146,14 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
     _sub_compound = False
     _valid_id_re = re.compile(r'^[a-zA-Z][\w\-\_\.]*$')
 
+    # An instance only gets its own list of calls once they are used, which
+    # keeps large widget trees compact.
+    _js_call_list = None
+
+    # A core template, and the function of tw2.core.native that renders its
+    # Mako flavor; generate_output calls it instead of rendering the template.
+    _native_template = None
+
     @classmethod
     def req(cls, **kw):
         """
@@ -187,7 +204,6 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
     def __init__(self, **kw):
         for k, v in six.iteritems(kw):
             setattr(self, k, v)
-        self._js_calls = []
 
     @classmethod
     def post_define(cls):
@@ -250,9 +266,9 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
                 )
 
         cls.resources = [r(parent=cls) for r in cls.resources]
-        cls._deferred = [k for k, v in inspect.getmembers(cls)
-                         if isinstance(v, pm.Deferred)]
         cls._attr = [p.name for p in cls._params.values() if p.attribute]
+        cls._attr_views = [(p.name, p.view_name)
+                           for p in cls._params.values() if p.attribute]
 
         if cls.parent:
             for p in cls.parent._all_params.values():
@@ -261,6 +277,8 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
                    p.default is not pm.Required:
 
                     setattr(cls, p.name, p.default)
+                    if isinstance(p.default, pm.Deferred):
+                        cls._deferred.append(p.name)
 
     @classmethod
     def _gen_compound_name(cls, attr, for_url):
@@ -330,7 +348,7 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
 
         # First, if we don't already have an id, then pick a random one.
         if not hasattr(self, 'id'):
-            self.id = 'id_' + str(uuid.uuid4()).replace('-', '')
+            self.id = 'id_' + uuid.uuid4().hex
 
         # Then, enforce any params marked with twc.Required.
         for k, v in self._params.items():
@@ -341,7 +359,8 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
         for a in self._deferred:
             dfr = getattr(self, a)
             if isinstance(dfr, pm.Deferred):
-                setattr(self, a, dfr.fn())
+                with profiler.span('deferred', a):
+                    setattr(self, a, dfr.fn())
 
         if self.validator and not hasattr(self, '_validated'):
             value = self.value
@@ -364,18 +383,26 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
 
             self.value = value
 
-        if self._attr or 'attrs' in self.__dict__:
-            self.attrs = self.attrs.copy()
-            if self.compound_id:
-                self.attrs['id'] = self.compound_id
-
-            for a in self._attr:
-                view_name = self._params[a].view_name
-                if self.attrs.get(view_name):
-                    raise pm.ParameterError(
-                        "Attr param clashes with user-supplied attr: '%s'" % a
-                    )
-                self.attrs[view_name] = getattr(self, a)
+        # A widget reads its attrs, usually its class's, without a copy. Its
+        # id and attribute params that are not None are laid over them; a
+        # None attribute is not rendered. The attrs are copied when the
+        # widget first changes them.
+        attrs = self.attrs
+        extra = None
+        compound_id = self.compound_id
+        if compound_id and attrs.get('id') != compound_id:
+            extra = {'id': compound_id}
+        for a, view_name in self._attr_views:
+            if attrs.get(view_name):
+                raise pm.ParameterError(
+                    "Attr param clashes with user-supplied attr: '%s'" % a
+                )
+            value = getattr(self, a)
+            if value is not None:
+                if extra is None:
+                    extra = {}
+                extra[view_name] = value
+        self.attrs = util.CopyOnWriteDict(attrs, extra)
 
     def iteritems(self):
         """
@@ -407,6 +434,18 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
         #log.debug("Adding call <%s> for %r statically.", call, self)
         self._js_calls.append([call, location])
 
+    @property
+    def _js_calls(self):
+        """ The calls added by :meth:`add_call`, allocated on first use. """
+        calls = self._js_call_list
+        if calls is None:
+            calls = self._js_call_list = []
+        return calls
+
+    @_js_calls.setter
+    def _js_calls(self, calls):
+        self._js_call_list = calls
+
     @util.class_or_instance
     def display(self, cls, value=None, displays_on=None, **kw):
         """Display the widget - render the template. In the template, the
@@ -421,6 +460,33 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
             parent. Set this to ``string`` to get raw string output.
         """
 
+        self = cls._for_display(self, value, kw)
+        with profiler.span('widget', self):
+            self._before_output()
+            return self.generate_output(displays_on)
+
+    @util.class_or_instance
+    def display_to(self, cls, write, value=None, displays_on=None, **kw):
+        """Display the widget as :meth:`display` does, but pass the output
+        to `write`, a function taking a string, in one or more pieces rather
+        than return it.
+
+        Child widgets and templates write their output to `write` too where
+        they can, instead of returning it to be copied into their parent's::
+
+            out = []
+            MyForm.display_to(out.append)
+            html = ''.join(out)
+        """
+        self = cls._for_display(self, value, kw)
+        with profiler.span('widget', self):
+            self._before_output()
+            self.write_output(write, displays_on)
+
+    @classmethod
+    def _for_display(cls, self, value, kw):
+        """ The instance to display with the arguments of `display`, given
+        the instance it was called on, if any. """
         # Support backwards compatibility with tw1-style calling
         if value is not None and 'value' not in kw:
             kw['value'] = value
@@ -436,12 +502,18 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
         # Register any deferred params that are handed to us late in the game
         # (after post_define).  The .prepare method handles processing them
         # later.
-        self._deferred += [k for k, v in kw.items() if isinstance(v, pm.Deferred)]
+        late = [k for k, v in kw.items() if isinstance(v, pm.Deferred)]
+        if late:
+            self._deferred = self._deferred + late
+        return self
 
+    def _before_output(self):
+        """ Prepare the widget, if it is the root, and its resources. """
         if not self.parent:
-            self.prepare()
+            with profiler.span('prepare', self):
+                self.prepare()
 
-        if self._js_calls:
+        if self._js_call_list:
             self.safe_modify('resources')
             #avoids circular reference
             from . import resources as rs
@@ -455,11 +527,11 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
                     ))
 
         if self.resources:
-            self.resources = WidgetBunch([r.req() for r in self.resources])
-            for r in self.resources:
-                r.prepare()
-
-        return self.generate_output(displays_on)
+            with profiler.span('resources', self):
+                self.resources = WidgetBunch(
+                    [r.req() for r in self.resources])
+                for r in self.resources:
+                    r.prepare()
 
     def generate_output(self, displays_on):
         """
@@ -478,9 +550,41 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
                 def generate_output(self, displays_on):
                     return "<span {0}>{1}</span>".format(self.attrs, self.text)
         """
+        return self._render_template(displays_on)
 
+    def write_output(self, write, displays_on):
+        """
+        Pass the output text for this widget to `write`, for
+        :meth:`display_to`.
+
+        By default this renders the widget's template straight to `write`,
+        or writes the result of :meth:`generate_output` if a subclass
+        overrides that. Subclasses that produce their output in pieces can
+        override this method to write them as they go.
+        """
+        if _func(type(self).generate_output) is not \
+           _func(Widget.generate_output):
+            write(self.generate_output(displays_on))
+        else:
+            self._render_template(displays_on, write)
+
+    def _native_renderer(self, mw):
+        """ The function of :mod:`tw2.core.native` that renders this
+        widget in place of its template, or None. """
+        native = self._native_template
+        if native and self.template == native[0] and \
+           not self.inline_engine_name and \
+           templating.get_engine_name(native[0], mw) == 'mako':
+            return native[1]
+        return None
+
+    def _render_template(self, displays_on, write=None):
         mw = core.request_local().get('middleware')
 
+        renderer = self._native_renderer(mw)
+        if renderer is not None:
+            return renderer(self, write)
+
         if not displays_on:
             displays_on = self._get_default_displays_on(mw)
 
@@ -500,6 +604,10 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
             kwargs,
             self.inline_engine_name,
             mw,
+            write,
+            # Only a child may hand its stream to a Genshi parent template
+            stream=self.parent is not None and (
+                mw is None or mw.config.genshi_streams),
         )
 
     def _get_default_displays_on(self, mw):
@@ -516,6 +624,13 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
         Validate form input. This should always be called on a class. It
         either returns the validated data, or raises a
         :class:`ValidationError` exception.
+
+        Where every widget in the tree uses the standard ``_validate``, the
+        input is first validated by a plan compiled for the class, which
+        skips the per-widget machinery. Only if that fails is it validated
+        through the widgets, to record the error messages, with the results
+        of the plan in place of running the validators again. The plan is
+        not used while a :mod:`tw2.core.metrics` sink is installed.
         """
         if cls.parent:
             raise core.WidgetError('Only call validate on root widgets')
@@ -526,8 +641,125 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
 
         # Key the validated widget by class id
         core.request_local()['validated_widget'] = ins
+
+        # Compiled on first use, once the class tree is complete
+        plan = cls.__dict__.get('_validation_plan', _omitted)
+        if plan is _omitted:
+            plan = cls._validation_plan = cls._gen_validation_plan()
+        # Widgets are measured one by one while validation is instrumented.
+        if plan is not None and metrics.sink is None and \
+           not hasattr(state, '_early_results'):
+            results = {}
+            try:
+                data = _run_plan(plan, value, state, results, None)
+            except vd.catch:
+                # The widgets record the errors, from the plan's results.
+                state = util.clone_object(state, _early_results=results)
+            else:
+                ins._mark_validated(value)
+                return data
         return ins._validate(value, state)
 
+    @classmethod
+    def _gen_validation_plan(cls):
+        """
+        Compile the validation of this widget class, and its children, into a
+        plan that :func:`_run_plan` executes without creating any widgets.
+        Return None if some widget in the tree does its own validation, or
+        has an ``__init__`` of its own, which may set its validator.
+        """
+        if _func(cls._validate) is not _func(Widget._validate) or \
+           _func(cls.__init__) is not _func(Widget.__init__):
+            return None
+        return (_PLAN_LEAF, cls.validator, None, cls.compound_key)
+
+    def _mark_validated(self, value):
+        """
+        Leave this widget as :meth:`_validate` would for `value`, without
+        running any validators.
+        """
+        self._validated = True
+        self.value = value
+
+    @classmethod
+    def validate_stream(cls, fields, state=None):
+        """
+        Validate form input that arrives as an iterable of ``(name, value)``
+        pairs, such as :func:`tw2.core.formparser.iter_form_fields` produces.
+        A webob request may be passed instead, in which case its body is
+        parsed incrementally.
+
+        Each field is validated by its leaf widget as soon as it arrives, so
+        validation overlaps reading the request body. Validators that look at
+        their state, and fields that are submitted more than once, are left
+        to the final pass. The result is the same as that of :meth:`validate`.
+        """
+        if cls.parent:
+            raise core.WidgetError('Only call validate on root widgets')
+        if isinstance(fields, webob.Request):
+            from .formparser import iter_form_fields
+            fields = iter_form_fields(fields.environ)
+
+        params = {}
+        early = {}
+        for name, value in fields:
+            if name in params:
+                prev = params[name]
+                if isinstance(prev, list):
+                    prev.append(value)
+                else:
+                    params[name] = [prev, value]
+                early.pop(name, None)
+                continue
+            params[name] = value
+            validator = cls._stream_validator(name)
+            if validator is None:
+                continue
+            try:
+                result = (validator.to_python(value, _stream_probe), False)
+            except vd.catch as e:
+                result = (e, True)
+            except _StateNeeded:
+                continue
+            except Exception:
+                # Left for the final pass to raise, with its proper state.
+                continue
+            early[name] = (value, validator) + result
+
+        state = util.clone_object(state, _early_results=early)
+        return cls.validate(params, state)
+
+    @classmethod
+    def _stream_validator(cls, name):
+        """
+        The validator of the leaf widget that validates the field `name`, or
+        None if there is no such widget or it does its own validation.
+        """
+        routes = cls.__dict__.get('_stream_routes')
+        if routes is None:
+            routes = cls._stream_routes = {}
+        segs = name.split(':')
+        pattern = ':'.join('#' if s.isdigit() else s for s in segs)
+        try:
+            return routes[pattern]
+        except KeyError:
+            pass
+
+        w = cls
+        if getattr(cls, 'id', None) and segs.pop(0) != cls.id:
+            w = None
+        for seg in segs:
+            w = w and _stream_child(w, seg)
+        while w and issubclass(w, DisplayOnlyWidget):
+            w = w.child
+        validator = None
+        if w and _func(w._validate) is _func(Widget._validate):
+            validator = w.validator
+        # Field names come from the client, so only so many are remembered.
+        if len(routes) < 1024:
+            routes[pattern] = validator
+        return validator
+
     @vd.catch_errors
     def _validate(self, value, state=None):
         """
@@ -539,7 +771,8 @@ class Widget(six.with_metaclass(WidgetMeta, pm.Parametered)):
         self._validated = True
         self.value = value
         if self.validator:
-            value = self.validator.to_python(value, state)
+            value = _to_python(self.validator, value, state,
+                               self.compound_key)
         return value
 
     def safe_modify(self, attr):
@@ -585,6 +818,7 @@ class CompoundWidget(Widget):
         "CompoundWidgets that have no id",
     )
     template = 'tw2.core.templates.display_children'
+    _native_template = (template, native.display_children)
     separator = pm.Param('HTML snippet which will be inserted '
                          'between each repeated child', default=None)
 
@@ -701,7 +935,8 @@ class CompoundWidget(Widget):
         exception_validator = self.validator
         if self.validator:
             try:
-                data = self.validator.to_python(data, state)
+                data = _to_python(self.validator, data, state,
+                                  self.compound_key)
             except vd.catch as e:
                 # If it failed to validate, check if the error_dict has any
                 # messages pertaining specifically to this widget's children.
@@ -726,6 +961,30 @@ class CompoundWidget(Widget):
 
         return data
 
+    @classmethod
+    def _gen_validation_plan(cls):
+        if _func(cls._validate) is not _func(CompoundWidget._validate) or \
+           _func(cls.__init__) is not _func(CompoundWidget.__init__):
+            return None
+        children = getattr(cls, 'children', [])
+        # Compound children are validated first, as in _validate
+        entries = []
+        for c in sorted(children, key=lambda c: not c._sub_compound):
+            node = c._gen_validation_plan()
+            if node is None:
+                return None
+            entries.append((None if c._sub_compound else c.key, node))
+        return (_PLAN_COMPOUND, cls.validator, tuple(entries),
+                cls.compound_key)
+
+    def _mark_validated(self, value):
+        self._validated = True
+        value = value or {}
+        self.value = value
+        for c in self.children:
+            c._mark_validated(value if c._sub_compound else
+                              value.get(c.key, ''))
+
     @classmethod
     def children_deep(cls):
         if getattr(cls, 'id', None):
@@ -737,26 +996,55 @@ class CompoundWidget(Widget):
     
 
 class RepeatingWidgetBunchCls(object):
+    """
+    Creates, and caches, the child widget class for each repetition.
 
-    def __init__(self, parent):
+    If `size` is not None, only the `size` most recently used classes are
+    kept; others are created again when they are next needed.
+    """
+    __slots__ = ('parent', 'size', '_repetition_cache')
+
+    def __init__(self, parent, size=None):
         self.parent = parent
-        self._repetition_cache = {}
+        self.size = size
+        self._repetition_cache = collections.OrderedDict()
 
     def __getitem__(self, item):
         if not isinstance(item, int):
             raise KeyError("Must specify an integer")
+        cache = self._repetition_cache
+        if self.size is None:
+            try:
+                return cache[item]
+            except KeyError:
+                rep = cache[item] = self._create(item)
+                return rep
+
         try:
-            rep = self._repetition_cache[item]
+            rep = cache.pop(item)
         except KeyError:
-            rep = self.parent.child(parent=self.parent, repetition=item)
-            self._repetition_cache[item] = rep
+            rep = self._create(item)
+        cache[item] = rep
+        while len(cache) > self.size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
         return rep
 
+    def _create(self, item):
+        return self.parent.child(parent=self.parent, repetition=item)
+
 
 class RepeatingWidgetBunch(object):
+    __slots__ = ('parent', 'rwbc', 'batch_validated', '_repetition_cache')
+
     def __init__(self, parent, rwbc):
         self.parent = parent
         self.rwbc = rwbc
+        # Row values validated without creating repetitions, which
+        # repetitions are marked with when they are first created.
+        self.batch_validated = None
         self._repetition_cache = {}
 
     def __len__(self):
@@ -774,9 +1062,72 @@ class RepeatingWidgetBunch(object):
         except KeyError:
             rep = self.rwbc[item].req(parent=weakref.proxy(self.parent))
             self._repetition_cache[item] = rep
+            if self.batch_validated is not None and \
+               item < len(self.batch_validated):
+                rep._mark_validated(self.batch_validated[item])
         return rep
 
 
+class StreamingRepeatingWidgetBunch(object):
+    """
+    The children of a :class:`RepeatingWidget` with `streaming` enabled.
+
+    Repetitions are created and prepared one at a time, as the template
+    iterates, and nothing here keeps a reference to them afterwards. The value
+    is consumed as it goes, so this can only be iterated once.
+    """
+    __slots__ = ('parent', 'rwbc', 'value')
+
+    def __init__(self, parent, rwbc, value):
+        self.parent = parent
+        self.rwbc = rwbc
+        self.value = value
+
+    def __len__(self):
+        if self.parent.repetitions is None:
+            raise TypeError(
+                "The number of repetitions is not known in advance when " +
+                "streaming from an iterator")
+        return self.parent.repetitions
+
+    def __getitem__(self, item):
+        if not isinstance(item, int):
+            raise KeyError("Must specify an integer")
+        return self.rwbc[item].req(parent=weakref.proxy(self.parent))
+
+    def _repetition(self, item, value=_omitted):
+        rep = self[item]
+        if value is not _omitted:
+            rep.value = value
+        rep.prepare()
+        return rep
+
+    def __iter__(self):
+        parent = self.parent
+        values = iter(self.value or [])
+        reps = parent.repetitions
+        if reps is None:
+            max_reps = parent.max_reps
+            i = 0
+            for v in values:
+                if max_reps is not None and i >= max_reps:
+                    break
+                yield self._repetition(i, v)
+                i += 1
+            reps = parent._clamp_repetitions(i + parent.extra_reps)
+        else:
+            i = 0
+            for v in itertools.islice(values, reps):
+                yield self._repetition(i, v)
+                i += 1
+
+        for i in range(i, reps):
+            yield self._repetition(i)
+
+        if not reps:
+            self._repetition(0)
+
+
 class RepeatingWidget(Widget):
     """
     A widget that has a single child, which is repeated an arbitrary number
@@ -800,11 +1151,28 @@ class RepeatingWidget(Widget):
         default=[],
     )
 
+    repetition_cache_size = pm.Param(
+        'Maximum number of child widget classes, one per repetition, to ' +
+        'keep cached. Repetitions beyond this are created again when ' +
+        'needed. None means no limit.',
+        default=1000,
+        request_local=False,
+    )
+
     repetition = pm.ChildVariable('The repetition of a child widget.')
 
     template = 'tw2.core.templates.display_children'
+    _native_template = (template, native.display_children)
     separator = pm.Param('HTML snippet which will be inserted '
                          'between each repeated child', default=None)
+    streaming = pm.Param(
+        'Create, prepare and display each repetition only when the ' +
+        'template reaches it, instead of all of them up front. The value ' +
+        'can then be any iterable, like a database cursor. Note that ' +
+        'children can only be iterated once, and that the template cannot ' +
+        'take len(children) if the value is an unsized iterator.',
+        default=False,
+    )
 
     @classmethod
     def post_define(cls):
@@ -829,7 +1197,28 @@ class RepeatingWidget(Widget):
             raise pm.ParameterError("Child must have no id")
 
         cls.child = cls.child(parent=cls)
-        cls.rwbc = RepeatingWidgetBunchCls(parent=cls)
+        cls.rwbc = RepeatingWidgetBunchCls(
+            parent=cls, size=cls.repetition_cache_size)
+        cls._batch_columns = cls._gen_batch_columns()
+
+    @classmethod
+    def _gen_batch_columns(cls):
+        """
+        If the child is a plain CompoundWidget of leaf widgets, return the
+        (key, validator) pair for each of its children, which lets
+        :meth:`_validate_batch` be used. Otherwise, return None.
+        """
+        child = cls.child
+        if not issubclass(child, CompoundWidget) or child.validator or \
+           _func(child._validate) is not _func(CompoundWidget._validate):
+            return None
+        columns = []
+        for c in child.children:
+            if c._sub_compound or \
+               _func(c._validate) is not _func(Widget._validate):
+                return None
+            columns.append((c.key, c.validator))
+        return columns
 
     def __init__(self, **kw):
         super(RepeatingWidget, self).__init__(**kw)
@@ -844,13 +1233,15 @@ class RepeatingWidget(Widget):
         if self.separator:
             self.separator = Markup(self.separator)
         value = self.value or []
-        if self.repetitions is None:
-            reps = len(value) + self.extra_reps
-            if self.max_reps is not None and reps > self.max_reps:
-                reps = self.max_reps
-            if self.min_reps is not None and reps < self.min_reps:
-                reps = self.min_reps
-            self.repetitions = reps
+        sized = hasattr(value, '__len__')
+        if self.repetitions is None and (sized or not self.streaming):
+            self.repetitions = self._clamp_repetitions(
+                len(value) + self.extra_reps)
+
+        if self.streaming and not hasattr(self, '_validated'):
+            self.children = StreamingRepeatingWidgetBunch(
+                self, self.rwbc, value)
+            return
 
         for i, v in enumerate(value):
             self.children[i].value = v
@@ -859,6 +1250,28 @@ class RepeatingWidget(Widget):
         if not self.repetitions:
             self.children[0].prepare()
 
+    @classmethod
+    def _gen_validation_plan(cls):
+        if _func(cls._validate) is not _func(RepeatingWidget._validate) or \
+           _func(cls.__init__) is not _func(RepeatingWidget.__init__) or \
+           not getattr(cls, 'child', None):
+            return None
+        node = cls.child._gen_validation_plan()
+        return node and (_PLAN_REPEAT, cls.validator,
+                         (node, cls._batch_columns), cls.compound_key)
+
+    def _mark_validated(self, value):
+        self._validated = True
+        self.value = value = value or []
+        self.children.batch_validated = value
+
+    def _clamp_repetitions(self, reps):
+        if self.max_reps is not None and reps > self.max_reps:
+            reps = self.max_reps
+        if self.min_reps is not None and reps < self.min_reps:
+            reps = self.min_reps
+        return reps
+
     @vd.catch_errors
     def _validate(self, value, state=None):
         """
@@ -878,18 +1291,63 @@ class RepeatingWidget(Widget):
 
         state = util.clone_object(state, full_dict=value, validated_values=data)
 
-        for i, v in enumerate(value):
-            try:
-                data.append(self.children[i]._validate(v, state))
-            except vd.catch:
-                data.append(vd.Invalid)
-                any_errors = True
+        if self._batch_columns is not None and metrics.sink is None and \
+           all(isinstance(v, dict) for v in value):
+            any_errors = self._validate_batch(value, data, state)
+        else:
+            for i, v in enumerate(value):
+                try:
+                    data.append(self.children[i]._validate(v, state))
+                except vd.catch:
+                    data.append(vd.Invalid)
+                    any_errors = True
         if self.validator:
-            data = self.validator.to_python(data, state)
+            data = _to_python(self.validator, data, state, self.compound_key)
         if any_errors:
             raise vd.ValidationError('childerror', self.validator, self)
         return data
 
+    def _validate_batch(self, value, data, state):
+        """
+        Validate a list of row dicts a column at a time, appending the result
+        for each row to `data`, and return whether any row failed.
+
+        The result is the same as validating each repetition in turn, but
+        repetition widgets are only created for rows that failed, and error
+        messages are only formatted for those rows.
+        """
+        early = getattr(state, '_early_results', None)
+        batch = early and early.get((self.compound_key, 'rows'))
+        if batch and batch[0] is value:
+            # Already validated by the plan of the root widget
+            rows, errors = batch[1], batch[2]
+        else:
+            rows, errors = _validate_rows(self._batch_columns, value, state,
+                                          self.compound_key)
+
+        self.children.batch_validated = value
+        if not errors:
+            data.extend(rows)
+            return False
+
+        for i, row in enumerate(rows):
+            if i in errors:
+                self._batch_failure(i, errors[i])
+                row = vd.Invalid
+            data.append(row)
+        return True
+
+    def _batch_failure(self, item, errors):
+        """
+        Set error messages on the repetition `item`, and its children, exactly
+        as they would have been set by validating it on its own.
+        """
+        rep = self.children[item]
+        for c in rep.children:
+            if c.key in errors:
+                c.error_msg = vd.wrap_error(errors[c.key], c).msg
+        rep.error_msg = six.text_type(vd.ValidationError('childerror'))
+
 
 class DisplayOnlyWidgetMeta(WidgetMeta):
     @classmethod
@@ -905,6 +1363,214 @@ class DisplayOnlyWidgetMeta(WidgetMeta):
         return children
 
 
+def _run_plan(node, value, state, results, rebase):
+    """
+    Validate `value` by the plan `node` from
+    :meth:`Widget._gen_validation_plan`, returning the same result as the
+    widgets' ``_validate`` methods would. Any validation error is raised as
+    it is, without setting error messages on widgets.
+
+    The result of each validator run is stored in `results`, as
+    ``_early_results`` are, by the compound key of its widget, so that the
+    widgets record an error without running them again; `rebase` turns the
+    keys of the widgets under a repeating widget into those of the
+    repetition, as :func:`_rebase`. The rows of a repeating widget validated
+    a column at a time are stored as a whole, by :func:`_run_batch`.
+    """
+    kind, validator, payload, key = node
+    if kind == _PLAN_LEAF:
+        if not validator:
+            return value
+        return _plan_call(validator, value, state, results,
+                          _rebase(key, rebase))
+
+    if kind == _PLAN_COMPOUND:
+        value = _plan_value(value, dict, validator)
+        data = {}
+        state = util.clone_object(state, full_dict=value,
+                                  validated_values=data)
+        return _run_compound(node, value, data, state, results, rebase)
+
+    key = _rebase(key, rebase)
+    value = _plan_value(value, list, validator)
+    data = []
+    state = util.clone_object(state, full_dict=value, validated_values=data)
+    child, columns = payload
+    if columns is not None and all(isinstance(v, dict) for v in value):
+        _run_batch(columns, value, data, state, results, key)
+    else:
+        for i, v in enumerate(value):
+            data.append(_run_plan(child, v, state, results,
+                                  (len(child[3]), _repetition_key(key, i))))
+    if validator:
+        data = _plan_call(validator, data, state, results, key)
+    return data
+
+
+def _plan_value(value, type_, validator):
+    value = value or type_()
+    if not isinstance(value, type_):
+        raise vd.ValidationError('corrupt', validator)
+    return value
+
+
+def _run_compound(node, value, data, state, results, rebase):
+    """ Fill `data` from `value` by the compound plan `node`, whose state
+    must already refer to both. """
+    kind, validator, entries, key = node
+    for ckey, child in entries:
+        if ckey is None:
+            data.update(_run_plan(child, value, state, results, rebase))
+        else:
+            val = _run_plan(child, value.get(ckey, ''), state, results,
+                            rebase)
+            if val is not vd.EmptyField:
+                data[ckey] = val
+    if validator:
+        data = _plan_call(validator, data, state, results,
+                          _rebase(key, rebase))
+    return data
+
+
+def _run_batch(columns, value, data, state, results, key):
+    """
+    Fill `data` with the rows of `value`, by the `columns` of a compound of
+    leaf widgets, as :meth:`RepeatingWidget._validate_batch` would. The rows
+    and their errors are stored in `results` for the repeating widget keyed
+    `key`, before raising the error of a row that failed.
+    """
+    rows, errors = _validate_rows(columns, value, state, key)
+    results[(key, 'rows')] = (value, rows, errors)
+    if errors:
+        raise vd.ValidationError('childerror')
+    data.extend(rows)
+
+
+def _validate_rows(columns, value, state, key):
+    """
+    Validate `value`, a list of row dicts, a column at a time, by `columns`,
+    the ``(key, validator)`` of each child of a compound of leaf widgets,
+    repeated by the widget keyed `key`. Return the validated rows, and the
+    errors of each row that failed, by its index.
+
+    A column whose validator can validate values without a state is
+    validated by one call; the values of other columns are validated one at
+    a time, with a state that refers to their row. A value the state's
+    ``_early_results`` hold a result for is not validated again.
+    """
+    rows = [{} for v in value]
+    errors = {}
+    state = util.clone_object(state)
+    early = getattr(state, '_early_results', None)
+    for ckey, validator in columns:
+        column = [v.get(ckey, '') for v in value]
+        if not validator:
+            for row, d in zip(rows, column):
+                if d is not vd.EmptyField:
+                    row[ckey] = d
+            continue
+        results = None
+        if not early:
+            many = getattr(validator, '_validate_many_stateless', None)
+            results = many and many(column)
+        for i, d in enumerate(column):
+            row = rows[i]
+            if results is not None and results[i] is not vd.Invalid:
+                d = results[i]
+            else:
+                # One at a time, or again for the error of one that failed
+                state.full_dict = value[i]
+                state.validated_values = row
+                try:
+                    if early:
+                        d = _to_python(validator, d, state, '%s:%s' % (
+                            _repetition_key(key, i), ckey))
+                    else:
+                        d = validator.to_python(d, state)
+                except vd.catch as e:
+                    errors.setdefault(i, {})[ckey] = e
+                    row[ckey] = vd.Invalid
+                    continue
+            if d is not vd.EmptyField:
+                row[ckey] = d
+    return rows, errors
+
+
+def _plan_call(validator, value, state, results, key):
+    """ ``validator.to_python``, with its result stored in `results`. """
+    try:
+        result = validator.to_python(value, state)
+    except vd.catch as e:
+        results[key] = (value, validator, e, True)
+        raise
+    results[key] = (value, validator, result, False)
+    return result
+
+
+def _to_python(validator, value, state, key):
+    """
+    ``validator.to_python(value, state)``, or the result the state's
+    ``_early_results`` hold for it under `key`, the compound key of the
+    widget validating `value`.
+    """
+    early = getattr(state, '_early_results', None)
+    if early and key in early:
+        raw, v, result, failed = early[key]
+        if v is validator and (raw is value or raw == value):
+            if failed:
+                raise result
+            return result
+    return validator.to_python(value, state)
+
+
+def _rebase(key, rebase):
+    """
+    The compound key of a repetition's widget, given `key`, that of the
+    same widget under the repeating widget's child class, and `rebase`, the
+    length of the child class's key and the repetition's key.
+    """
+    if key is None or rebase is None:
+        return key
+    return rebase[1] + key[rebase[0]:]
+
+
+def _repetition_key(key, i):
+    """ The compound key of repetition `i` of the widget keyed `key`. """
+    return '%s:%d' % (key, i) if key else str(i)
+
+
+def _stream_child(w, seg):
+    """ The child of widget class `w` that validates the value keyed `seg`. """
+    while issubclass(w, DisplayOnlyWidget):
+        w = w.child
+    if issubclass(w, RepeatingWidget):
+        return w.child if seg.isdigit() else None
+    if issubclass(w, CompoundWidget):
+        for c in w.children:
+            if c._sub_compound:
+                found = _stream_child(c, seg)
+                if found:
+                    return found
+            elif c.key == seg:
+                return c
+    return None
+
+
+class _StateNeeded(BaseException):
+    """ Raised when a validator run by validate_stream uses its state. """
+
+
+class _StreamProbe(object):
+    """ Stands in for the state of validators run ahead of the final pass,
+    which has the real state. """
+
+    def __getattr__(self, name):
+        raise _StateNeeded(name)
+
+
+_stream_probe = _StreamProbe()
+
+
 def calc_name(cls, kw, char='s'):
     if 'parent' in kw:
         newname = kw['parent'].__name__ + '__' + cls.__name__
@@ -1006,6 +1672,18 @@ class DisplayOnlyWidget(six.with_metaclass(DisplayOnlyWidgetMeta, Widget)):
         except vd.ValidationError:
             raise vd.ValidationError('childerror', self.validator, self)
 
+    @classmethod
+    def _gen_validation_plan(cls):
+        if _func(cls._validate) is not _func(DisplayOnlyWidget._validate) or \
+           _func(cls.__init__) is not _func(DisplayOnlyWidget.__init__) or \
+           not getattr(cls, 'child', None):
+            return None
+        return cls.child._gen_validation_plan()
+
+    def _mark_validated(self, value):
+        self._validated = True
+        self.child._mark_validated(value)
+
     @classmethod
     def children_deep(cls):
         for c in cls.child.children_deep():
@@ -1030,6 +1708,15 @@ class Page(DisplayOnlyWidget):
         default=pm.Deferred(default_content_type),
         request_local=False,
     )
+    streaming = pm.Param(
+        'Whether :meth:`request` streams the page: the head, with the '
+        'resources of the widgets in the page injected, is sent before the '
+        'body is rendered, and the body is sent a piece at a time. The '
+        'middleware does not inject resources in a streamed page; the page '
+        'injects them itself.',
+        default=False,
+        request_local=False,
+    )
     template = "tw2.core.templates.page"
     id_suffix = 'page'
     _no_autoid = True
@@ -1049,6 +1736,9 @@ class Page(DisplayOnlyWidget):
         resp = webob.Response(request=req, content_type=ct)
         ins = cls.req()
         ins.fetch_data(req)
+        if cls.streaming:
+            resp.app_iter = ins._stream(dict(core.request_local()))
+            return resp
         resp.body = ins.display().encode(
             core.request_local()['middleware'].config.encoding
         )
@@ -1056,3 +1746,102 @@ class Page(DisplayOnlyWidget):
 
     def fetch_data(self, req):
         pass
+
+    def _stream(self, state):
+        """
+        Yield the encoded page for a streamed response, in the request-local
+        `state` of the request, which the middleware has cleared by the time
+        the response is iterated.
+
+        The page is rendered with a marker in place of its child, and split
+        there. Resources declared by the widget classes of the page are
+        injected into the part before it, which is sent first. Resources
+        registered while the child is displayed are injected before
+        ``</body>``.
+        """
+        from . import resources as rs
+        rl = core.request_local()
+        rl.clear()
+        rl.update(state)
+        try:
+            config = rl['middleware'].config
+            encoding = config.encoding
+
+            self._before_output()
+            child = self.child
+            if config.inject_resources:
+                for cls in _widget_classes(type(self)):
+                    for r in cls.resources:
+                        r.req().prepare()
+
+            marker = six.u('<!--tw2.page:%s-->') % uuid.uuid4().hex
+            self.child = child and _Marker(marker)
+            try:
+                frame = six.text_type(self.generate_output('string'))
+            finally:
+                self.child = child
+            if marker not in frame:
+                # Nothing to stream.
+                if config.inject_resources:
+                    frame = rs.inject_resources(frame, encoding=encoding)
+                yield frame.encode(encoding)
+                return
+            head, _, tail = frame.partition(marker)
+
+            injected = []
+            if config.inject_resources:
+                early = rl.get('resources', [])
+                injected = [r for r in early if r.location != 'bodybottom']
+                head = rs.inject_resources(head, injected, encoding)
+                # The rest are injected with those registered from now on.
+                rl['resources'] = [r for r in early if r not in injected]
+            yield head.encode(encoding)
+
+            if child:
+                mw = rl['middleware']
+                if child._native_renderer(mw) is native.display_children:
+                    child._before_output()
+                    pieces = native.iter_children(child)
+                else:
+                    out = []
+                    child.display_to(out.append, displays_on='string')
+                    pieces = [six.u('').join(out)]
+                for piece in pieces:
+                    if piece:
+                        yield piece.encode(encoding)
+
+            if config.inject_resources:
+                late = [r for r in rl.get('resources', [])
+                        if r.location and r not in injected]
+                if late:
+                    html = six.u('\n').join(
+                        r.display(displays_on='string') for r in late)
+                    end = tail.lower().rfind('</body')
+                    if end < 0:
+                        end = len(tail)
+                    tail = tail[:end] + html + tail[end:]
+            yield tail.encode(encoding)
+        finally:
+            rl.clear()
+
+
+class _Marker(object):
+    """ Stands in for the child of a streamed :class:`Page`. """
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def display(self, *args, **kw):
+        return Markup(self.marker)
+
+
+def _widget_classes(cls):
+    """ `cls` and the widget classes of its children, recursively. """
+    yield cls
+    child = getattr(cls, 'child', None)
+    children = list(getattr(cls, 'children', None) or [])
+    if isinstance(child, type) and issubclass(child, Widget):
+        children.append(child)
+    for c in children:
+        for cc in _widget_classes(c):
+            yield cc